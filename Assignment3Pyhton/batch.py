@@ -0,0 +1,265 @@
+# batch.py
+"""Headless batch processing with the same filters as the editor.
+
+Example:
+    python batch.py photos/ "scans/*.tif" -o out/ --op noise=20 --op brightness=10 --op sharpen=30
+    python batch.py photos/ -o out/ --recipe look.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from operations import parse_operation
+from parallel import set_worker_count
+from pipeline import pipelines
+from recipe import Recipe
+from tiled_image import TiledImage
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+# Kept in the output directory: the operations each output was made with
+MANIFEST_NAME = ".pixelforge-batch.json"
+
+def collect_inputs(inputs):
+    """Expand directories and glob patterns into a sorted list of image files."""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            candidates = glob.glob(item)
+        files.extend(path for path in candidates
+                     if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(set(files))
+
+def output_path_for(input_path, output_dir, extension=None):
+    """Build the output file name for an input file."""
+    stem, ext = os.path.splitext(os.path.basename(input_path))
+    return os.path.join(output_dir, stem + (extension or ext))
+
+def find_output_collisions(files, output_dir, extension=None):
+    """{output path: [input paths]} for outputs that more than one input would write.
+
+    Outputs are named after the input's file name alone, so day1/IMG_1.JPG
+    and day2/IMG_1.JPG (or a.jpg and a.png under --ext) would overwrite
+    each other. Paths are compared the way the file system compares them.
+    """
+    targets = {}
+    for path in files:
+        out = output_path_for(path, output_dir, extension)
+        targets.setdefault(os.path.normcase(out), []).append(path)
+    return {out: paths for out, paths in targets.items() if len(paths) > 1}
+
+def partial_path_for(output_path):
+    """Where an output is written before being renamed into place.
+
+    The extension is kept last (photo.part.png) because cv2.imwrite picks
+    the encoder from it.
+    """
+    stem, ext = os.path.splitext(output_path)
+    return stem + ".part" + ext
+
+def operations_key(operations):
+    """A string identifying a (name, value) list or a Recipe, compared between runs."""
+    if isinstance(operations, Recipe):
+        return json.dumps(operations.to_dict()["steps"], sort_keys=True)
+    return json.dumps([[name, value] for name, value in operations])
+
+def load_manifest(output_dir):
+    """{output file name: operations_key} from the last runs into output_dir."""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f).get("outputs", {})
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(output_dir, outputs):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".part", "w") as f:
+        json.dump({"outputs": outputs}, f, indent=1, sort_keys=True)
+    os.replace(path + ".part", path)
+
+def is_up_to_date(input_path, output_path, made_with=None, wanted=None):
+    """An output is up to date when it exists, is newer than its input and was made with the wanted operations."""
+    return (made_with == wanted
+            and os.path.exists(output_path)
+            and os.path.getmtime(output_path) >= os.path.getmtime(input_path))
+
+def _init_worker():
+    # One thread per process, the pool already uses every core
+    cv2.setNumThreads(1)
+    set_worker_count(1)
+
+def process_file(job):
+    """Run the operations (a (name, value) list or a Recipe) on one file.
+
+    The output is written under partial_path_for and renamed when complete,
+    so a run killed halfway never leaves a truncated file that the next run
+    would take as up to date. Returns (input_path, status, bytes_read, message).
+    """
+    input_path, output_path, operations, tile_size = job
+    size = os.path.getsize(input_path)
+    if tile_size:
+        return process_file_tiled(input_path, output_path, operations, tile_size, size)
+
+    bgr = cv2.imread(input_path)
+    if bgr is None:
+        return input_path, "failed", 0, "could not decode image"
+
+    try:
+        # Swap channels in place and reuse the decoded frame as the output buffer
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=bgr)
+        if isinstance(operations, Recipe):
+            result = operations.render(rgb, out=rgb)
+        else:
+            # The cached pipeline keeps its scratch buffers between files
+            result = pipelines.get(operations).run(rgb, out=rgb)
+        partial_path = partial_path_for(output_path)
+        if not cv2.imwrite(partial_path, cv2.cvtColor(result, cv2.COLOR_RGB2BGR, dst=result)):
+            return input_path, "failed", size, "could not write output"
+        os.replace(partial_path, output_path)
+    except Exception as e:
+        _remove_partial(output_path)
+        return input_path, "failed", size, str(e)
+    return input_path, "done", size, ""
+
+def _remove_partial(output_path):
+    partial_path = partial_path_for(output_path)
+    if os.path.exists(partial_path):
+        os.remove(partial_path)
+
+def process_file_tiled(input_path, output_path, operations, tile_size, size):
+    """Like process_file, but keeps the frame in a memory-mapped file and filters it tile by tile."""
+    try:
+        with TiledImage.open(input_path, tile_size=tile_size) as image:
+            with image.apply_operations(operations, tile_size) as result:
+                partial_path = partial_path_for(output_path)
+                if not result.save(partial_path, tile_size):
+                    return input_path, "failed", size, "could not write output"
+        os.replace(partial_path, output_path)
+    except Exception as e:
+        _remove_partial(output_path)
+        return input_path, "failed", size, str(e)
+    return input_path, "done", size, ""
+
+def run_batch(files, output_dir, operations, workers=None, extension=None, force=False, tile_size=None):
+    """Process files on a process pool and return a summary dict with throughput.
+
+    The operations behind every output are recorded in the directory's
+    manifest, so running again with different operations redoes the files.
+    Raises ValueError before anything runs when two inputs share an output name.
+    """
+    collisions = find_output_collisions(files, output_dir, extension)
+    if collisions:
+        lines = [f"  {out}: {', '.join(paths)}" for out, paths in sorted(collisions.items())]
+        raise ValueError("these inputs would write the same output file; rename them or run them separately:\n"
+                         + "\n".join(lines))
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    wanted = operations_key(operations)
+
+    jobs = []
+    skipped = 0
+    for path in files:
+        out = output_path_for(path, output_dir, extension)
+        if not force and is_up_to_date(path, out, manifest.get(os.path.basename(out)), wanted):
+            skipped += 1
+            continue
+        jobs.append((path, out, operations, tile_size))
+
+    workers = workers or os.cpu_count() or 1
+    done = failed = total_bytes = 0
+    start = time.perf_counter()
+
+    if jobs:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                # Small chunks keep all workers busy without paying IPC per file
+                chunksize = max(1, min(16, len(jobs) // (workers * 4)))
+                results = pool.map(process_file, jobs, chunksize=chunksize)
+                for job, (path, status, size, message) in zip(jobs, results):
+                    total_bytes += size
+                    name = os.path.basename(job[1])
+                    if status == "done":
+                        done += 1
+                        manifest[name] = wanted
+                    else:
+                        failed += 1
+                        manifest.pop(name, None)
+                        print(f"Failed: {path} ({message})", file=sys.stderr)
+        finally:
+            # Also after Ctrl+C, so the files finished so far are not redone
+            save_manifest(output_dir, manifest)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "processed": done,
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": elapsed,
+        "images_per_second": done / elapsed if elapsed > 0 else 0.0,
+        "mb_per_second": total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply PixelForge filters to many images without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="Image directories or glob patterns")
+    parser.add_argument("-o", "--output", required=True, help="Directory for processed images")
+    parser.add_argument("--op", dest="operations", action="append", default=[], metavar="NAME[=VALUE]",
+                        help="Operation to apply, in order (blur, brightness, contrast, sharpen, noise, grayscale)")
+    parser.add_argument("--recipe", default=None, metavar="FILE",
+                        help="Recipe saved from the editor to replay instead of --op (ROIs scale with each image)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--ext", default=None, help="Output extension such as .png (default: keep input extension)")
+    parser.add_argument("--force", action="store_true", help="Reprocess files even if the output is newer than its input and was made with the same operations")
+    parser.add_argument("--tile-size", type=int, default=None, metavar="PIXELS",
+                        help="Filter each image in tiles of this size through a memory-mapped file; memory stays bounded "
+                             "by the tile size only for .npy input, other formats are decoded in full once")
+    args = parser.parse_args(argv)
+
+    try:
+        operations = [parse_operation(spec) for spec in args.operations]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.recipe:
+        if operations:
+            parser.error("use either --op or --recipe, not both")
+        try:
+            recipe = Recipe.load(args.recipe)
+        except (OSError, ValueError) as e:
+            parser.error(f"could not read recipe: {e}")
+        if recipe.has_roi():
+            if args.tile_size:
+                parser.error("--tile-size does not support recipes with ROI steps")
+            operations = recipe
+        else:
+            # Whole-frame steps are an ordinary operation chain
+            operations = recipe.operations()
+    if not operations:
+        parser.error("at least one --op or a non-empty --recipe is required")
+
+    files = collect_inputs(args.inputs)
+    if not files:
+        print("No images found.")
+        return 1
+
+    extension = args.ext if not args.ext or args.ext.startswith(".") else "." + args.ext
+    try:
+        summary = run_batch(files, args.output, operations, args.workers, extension, args.force, args.tile_size)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Processed {summary['processed']}, skipped {summary['skipped']} up to date, "
+          f"failed {summary['failed']} in {summary['seconds']:.1f}s "
+          f"({summary['images_per_second']:.2f} images/s, {summary['mb_per_second']:.2f} MB/s)")
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
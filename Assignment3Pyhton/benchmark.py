@@ -0,0 +1,305 @@
+# benchmark.py
+"""Performance checks for the filter modules.
+
+Example:
+    python benchmark.py brightness
+    python benchmark.py parallel --workers 1,2,4,8
+    python benchmark.py suite --megapixels 1,12,50 -o before.json
+    python benchmark.py compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from blur_effect import apply_blur
+from brightness_adjust import adjust_brightness
+from noise_reduction import apply_median_blur
+from operations import OPERATIONS
+from sharpen import apply_sharpen
+import parallel
+
+# Named frame sizes as (width, height)
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+    "8K": (7680, 4320),
+}
+
+def synthetic_image(width, height, channels=3, seed=0):
+    """Smooth random image, closer to a photo than pure noise (compresses and filters realistically)."""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, size=(max(1, height // 16), max(1, width // 16), channels), dtype=np.uint8)
+    image = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    noise = rng.integers(0, 16, size=image.shape, dtype=np.uint8)
+    image = cv2.add(image, noise)
+    return image if channels > 1 else image.reshape(height, width)
+
+def time_call(func, repeat=5, warmup=1):
+    """Run func repeat times after warmup runs, returning the list of durations in ms."""
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+def _brightness_split_merge(image, brightness_value):
+    """The previous adjust_brightness: split, add, clip, merge (kept as the baseline)."""
+    hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
+    h, s, v = cv2.split(hsv)
+    v = cv2.add(v, brightness_value)
+    v = np.clip(v, 0, 255)
+    return cv2.cvtColor(cv2.merge([h, s, v]), cv2.COLOR_HSV2RGB)
+
+def bench_brightness(resolutions=("4K", "8K"), values=(-60, 40), repeat=5):
+    """Compare adjust_brightness against the split/merge baseline; returns result rows."""
+    rows = []
+    for name in resolutions:
+        width, height = RESOLUTIONS[name]
+        image = synthetic_image(width, height)
+        out = np.empty_like(image)
+        for value in values:
+            baseline = np.median(time_call(lambda: _brightness_split_merge(image, value), repeat))
+            current = np.median(time_call(lambda: adjust_brightness(image, value, dst=out), repeat))
+            identical = np.array_equal(_brightness_split_merge(image, value), adjust_brightness(image, value))
+            rows.append({
+                "resolution": name, "value": value,
+                "baseline_ms": baseline, "current_ms": current,
+                "speedup": baseline / current, "identical": identical,
+            })
+    return rows
+
+# Neighbourhood filters at strong settings, each writing into a reused buffer
+PARALLEL_FILTERS = {
+    "blur": lambda image, out: apply_blur(image, 100, dst=out),
+    "median": lambda image, out: apply_median_blur(image, 15, dst=out),
+    "median-exact": lambda image, out: apply_median_blur(image, 15, dst=out, exact=True),
+    "sharpen": lambda image, out: apply_sharpen(image, 100, dst=out),
+}
+
+def bench_parallel(resolution="4K", worker_counts=(1, 2, 4), repeat=5):
+    """Time each neighbourhood filter split over 1..N strip workers; returns result rows."""
+    width, height = RESOLUTIONS[resolution]
+    image = synthetic_image(width, height)
+    out = np.empty_like(image)
+    previous = parallel.worker_count()
+    rows = []
+    try:
+        for name, func in PARALLEL_FILTERS.items():
+            parallel.set_worker_count(1)
+            reference = func(image, None)
+            single = None
+            for workers in worker_counts:
+                parallel.set_worker_count(workers)
+                ms = np.median(time_call(lambda: func(image, out), repeat))
+                single = single or ms
+                rows.append({
+                    "filter": name, "workers": workers, "ms": ms,
+                    "speedup": single / ms, "identical": np.array_equal(func(image, None), reference),
+                })
+    finally:
+        parallel.set_worker_count(previous)
+    return rows
+
+# Sweep used by the "suite" command: every operation over its slider range
+MEGAPIXELS = (1, 4, 12, 24, 50, 100)
+DEFAULT_MEGAPIXELS = (1, 4, 12)
+LAYOUTS = {"rgb": 3, "gray": 1}
+PARAMETER_RANGES = {
+    "blur": (10, 50, 100),
+    "brightness": (-80, -20, 40, 80),
+    "contrast": (-50, 50, 100),
+    "sharpen": (20, 60, 100),
+    "noise": (20, 50, 100),
+    "grayscale": (None,),
+}
+ROI_SIZE = 512  # side of the centred square used by the ROI variants
+
+def frame_size(megapixels):
+    """(width, height) of a 4:3 frame with about this many megapixels."""
+    width = int(round((megapixels * 1e6 * 4 / 3) ** 0.5))
+    return width, int(round(width * 3 / 4))
+
+def centred_roi(width, height, size=ROI_SIZE):
+    x1, y1 = max(0, (width - size) // 2), max(0, (height - size) // 2)
+    return x1, y1, min(width, x1 + size), min(height, y1 + size)
+
+def latency_stats(durations):
+    """Percentiles of a list of durations in ms."""
+    values = np.asarray(durations)
+    return {
+        "min_ms": float(values.min()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p90_ms": float(np.percentile(values, 90)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+        "mean_ms": float(values.mean()),
+    }
+
+def peak_memory(func):
+    """Peak bytes allocated through Python and NumPy during one call.
+
+    Run separately from the timed calls since tracing slows allocation down.
+    Scratch memory OpenCV allocates inside a call is not seen, the arrays
+    it returns are.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_suite(megapixels=DEFAULT_MEGAPIXELS, layouts=tuple(LAYOUTS), operations=None,
+                variants=("full", "roi"), repeat=5, warmup=1, log=None):
+    """Time every operation, value, variant and layout on synthetic frames; returns result rows.
+
+    Operations a layout cannot run (an OpenCV error) are kept as rows with
+    status "unsupported" so runs stay comparable.
+    """
+    rows = []
+    for mp in megapixels:
+        width, height = frame_size(mp)
+        for layout in layouts:
+            image = synthetic_image(width, height, LAYOUTS[layout])
+            roi = centred_roi(width, height)
+            for name in operations or PARAMETER_RANGES:
+                op = OPERATIONS[name]
+                for value in PARAMETER_RANGES[name]:
+                    for variant in variants:
+                        if variant == "roi":
+                            func = lambda: op["apply_roi"](image, roi, value)
+                        else:
+                            func = lambda: op["apply"](image, value)
+                        row = {
+                            "case": f"{name}={value}/{variant}/{layout}/{mp:g}MP",
+                            "operation": name, "value": value, "variant": variant,
+                            "layout": layout, "megapixels": mp, "width": width, "height": height,
+                        }
+                        try:
+                            row.update(latency_stats(time_call(func, repeat, warmup)))
+                            row["peak_bytes"] = peak_memory(func)
+                            row["status"] = "ok"
+                        except cv2.error:
+                            row["status"] = "unsupported"
+                        rows.append(row)
+                        if log:
+                            log(row)
+    return rows
+
+def environment_info():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "opencv_threads": cv2.getNumThreads(),
+        "strip_workers": parallel.worker_count(),
+    }
+
+def compare_results(baseline, current, threshold=0.10):
+    """Match cases by name and return (case, baseline p50, current p50, ratio, regressed) rows."""
+    before = {row["case"]: row for row in baseline["results"] if row["status"] == "ok"}
+    rows = []
+    for row in current["results"]:
+        old = before.get(row["case"])
+        if old is None or row["status"] != "ok":
+            continue
+        ratio = row["p50_ms"] / old["p50_ms"] if old["p50_ms"] > 0 else float("inf")
+        rows.append((row["case"], old["p50_ms"], row["p50_ms"], ratio, ratio > 1 + threshold))
+    return rows
+
+def _split_list(text, convert=str):
+    return [convert(item) for item in text.split(",") if item.strip()]
+
+def _print_suite_row(row):
+    if row["status"] != "ok":
+        print(f"{row['case']:<40} {row['status']}")
+        return
+    print(f"{row['case']:<40} p50 {row['p50_ms']:9.2f} ms  p90 {row['p90_ms']:9.2f} ms  "
+          f"p99 {row['p99_ms']:9.2f} ms  peak {row['peak_bytes'] / 1024 ** 2:8.1f} MB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PixelForge filters.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    brightness = commands.add_parser("brightness", help="Value-channel brightness against the split/merge baseline")
+    brightness.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+
+    strips = commands.add_parser("parallel", help="Strip-parallel scaling of the neighbourhood filters")
+    strips.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    strips.add_argument("--workers", default="1,2,4", help="Comma-separated strip worker counts")
+
+    suite = commands.add_parser("suite", help="Every operation, full frame and ROI, written as JSON")
+    suite.add_argument("--megapixels", default=",".join(map(str, DEFAULT_MEGAPIXELS)),
+                       help=f"Comma-separated frame sizes in MP (any of {', '.join(map(str, MEGAPIXELS))} or others)")
+    suite.add_argument("--layouts", default=",".join(LAYOUTS), help="Comma-separated channel layouts (rgb, gray)")
+    suite.add_argument("--ops", default=",".join(PARAMETER_RANGES), help="Comma-separated operations")
+    suite.add_argument("--variants", default="full,roi", help="full, roi or both")
+    suite.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    suite.add_argument("--warmup", type=int, default=1, help="Untimed runs before timing")
+    suite.add_argument("-o", "--output", default=None, help="Write results to this JSON file")
+
+    compare = commands.add_parser("compare", help="Compare two JSON results from the suite command")
+    compare.add_argument("baseline", help="Earlier results")
+    compare.add_argument("current", help="New results")
+    compare.add_argument("--threshold", type=float, default=0.10, help="Slowdown that counts as a regression (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = 0
+        for case, old, new, ratio, regressed in compare_results(baseline, current, args.threshold):
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{case:<40} {old:9.2f} ms -> {new:9.2f} ms ({ratio:.2f}x){flag}")
+        print(f"{regressions} regression(s) over {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    print(f"OpenCV {cv2.__version__}, {cv2.getNumThreads()} thread(s), {os.cpu_count()} CPU(s)")
+    if args.command == "suite":
+        unknown = [name for name in _split_list(args.ops) if name not in PARAMETER_RANGES]
+        if unknown:
+            parser.error(f"unknown operation(s): {', '.join(unknown)}")
+        rows = bench_suite(
+            megapixels=_split_list(args.megapixels, float),
+            layouts=_split_list(args.layouts),
+            operations=_split_list(args.ops),
+            variants=_split_list(args.variants),
+            repeat=args.repeat, warmup=args.warmup, log=_print_suite_row,
+        )
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"environment": environment_info(), "results": rows}, f, indent=2)
+            print(f"Wrote {len(rows)} results to {args.output}")
+        return 0
+
+    if args.command == "parallel":
+        worker_counts = _split_list(args.workers, int)
+        for row in bench_parallel(worker_counts=worker_counts, repeat=args.repeat):
+            print(f"{row['filter']:>12} x{row['workers']:<2}: {row['ms']:7.1f} ms "
+                  f"({row['speedup']:.2f}x, identical output: {row['identical']})")
+        return 0
+
+    for row in bench_brightness(repeat=args.repeat):
+        print(f"{row['resolution']:>5} brightness {row['value']:+4d}: "
+              f"split/merge {row['baseline_ms']:7.1f} ms -> value-channel {row['current_ms']:7.1f} ms "
+              f"({row['speedup']:.2f}x, identical output: {row['identical']})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
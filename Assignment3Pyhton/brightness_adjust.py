@@ -1,23 +1,41 @@
 import cv2
 import numpy as np
+from lut_cache import point_luts
+from roi_utils import roi_target
 
-def adjust_brightness(image, brightness_value):
+def adjust_brightness(image, brightness_value, dst=None):
     """Adjust the brightness of the entire image"""
+    if image.ndim == 2:
+        # A gray pixel converts to H = S = 0 and V = itself, so only V moves
+        brightness_value = int(brightness_value)
+        if brightness_value >= 0:
+            return cv2.add(image, brightness_value, dst=dst)
+        return cv2.subtract(image, -brightness_value, dst=dst)
     hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
-    h, s, v = cv2.split(hsv)
-    v = cv2.add(v, brightness_value)
-    v = np.clip(v, 0, 255)
-    hsv_adjusted = cv2.merge([h, s, v])
-    return cv2.cvtColor(hsv_adjusted, cv2.COLOR_HSV2RGB)
+    shift_value_channel(hsv, brightness_value)
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB, dst=dst)
 
-def adjust_brightness_with_roi(image, roi_coords, brightness_value):
+def shift_value_channel(hsv, brightness_value):
+    """Add brightness_value to the V channel of an HSV image in place, saturating at 0/255"""
+    # One saturating pass with a per-channel scalar: no split/merge and no clip copy
+    brightness_value = int(brightness_value)
+    if brightness_value >= 0:
+        cv2.add(hsv, (0, 0, brightness_value, 0), dst=hsv)
+    else:
+        cv2.subtract(hsv, (0, 0, -brightness_value, 0), dst=hsv)
+    return hsv
+
+def brightness_lut(brightness_value):
+    """256-entry table for the HSV value channel, matching adjust_brightness (cached)"""
+    return point_luts.get("brightness", brightness_value, _build_brightness_lut)
+
+def _build_brightness_lut(brightness_value):
+    values = np.arange(256, dtype=np.int16) + int(brightness_value)
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+def adjust_brightness_with_roi(image, roi_coords, brightness_value, dst=None, inplace=False):
     """Adjust brightness only within the specified ROI"""
-    x1, y1, x2, y2 = roi_coords
-    result = image.copy()
-    
-    roi = image[y1:y2, x1:x2]
-    
-    processed_roi = adjust_brightness(roi, brightness_value)
-    
-    result[y1:y2, x1:x2] = processed_roi
-    return result
\ No newline at end of file
+    result, src, target = roi_target(image, roi_coords, dst, inplace)
+    if src is not None:
+        adjust_brightness(src, brightness_value, dst=target)
+    return result
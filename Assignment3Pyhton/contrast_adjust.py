@@ -1,18 +1,25 @@
 import cv2
 import numpy as np
+from lut_cache import point_luts
+from roi_utils import roi_target
 
-def adjust_contrast(image, contrast_value):
+def adjust_contrast(image, contrast_value, dst=None):
     """Adjust contrast for the entire image"""
     alpha = 1.0 + (contrast_value / 100.0)
-    return cv2.convertScaleAbs(image, alpha=alpha, beta=0)
+    return cv2.convertScaleAbs(image, alpha=alpha, beta=0, dst=dst)
 
-def adjust_contrast_with_roi(image, roi_coords, contrast_value):
+def contrast_lut(contrast_value):
+    """256-entry table with the same per-pixel result as adjust_contrast (cached)"""
+    return point_luts.get("contrast", contrast_value, _build_contrast_lut)
+
+def _build_contrast_lut(contrast_value):
+    alpha = np.float32(1.0 + (contrast_value / 100.0))
+    values = np.abs(np.rint(np.arange(256, dtype=np.float32) * alpha))
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+def adjust_contrast_with_roi(image, roi_coords, contrast_value, dst=None, inplace=False):
     """Adjust contrast only within the specified ROI"""
-    x1, y1, x2, y2 = roi_coords
-    result = image.copy()
-    
-    roi = image[y1:y2, x1:x2]
-    processed_roi = adjust_contrast(roi, contrast_value)
-    
-    result[y1:y2, x1:x2] = processed_roi
-    return result
\ No newline at end of file
+    result, src, target = roi_target(image, roi_coords, dst, inplace)
+    if src is not None:
+        adjust_contrast(src, contrast_value, dst=target)
+    return result
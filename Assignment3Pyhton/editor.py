@@ -1,13 +1,22 @@
 import tkinter as tk
 
-from image_handler import open_image, display_image, save_image
+from image_handler import ask_image_path, read_image, read_reduced_image, display_image, display_patch, save_format, DEFAULT_SAVE_OPTIONS
 import os
 from blur_effect import apply_blur, apply_blur_with_roi  # Import blur functions
 from brightness_adjust import adjust_brightness, adjust_brightness_with_roi # Import brightness functions
 from contrast_adjust import adjust_contrast, adjust_contrast_with_roi # Import contrast functions
 from sharpen import apply_sharpen, apply_sharpen_with_roi  # Import sharpen functions
-from noise_reduction import apply_median_blur, apply_median_blur_with_roi #Import noise reduction functions
-from grayscale import apply_grayscale, apply_grayscale_with_roi #Import greyscale functions
+from noise_reduction import apply_median_blur, apply_median_blur_with_roi, denoise_kernel_size #Import noise reduction functions
+from grayscale import apply_grayscale, apply_grayscale_with_roi, grayscale_plane, expand_to_rgb #Import greyscale functions
+from preview import build_preview_proxy, proxy_roi_view, scale_roi, scale_kernel # Canvas-sized preview proxies
+from preview_scheduler import PreviewScheduler, FullRenderScheduler # Background slider renders
+from history import EditHistory # Undo/redo
+from roi_utils import clip_roi # Shared ROI clipping
+from viewport import ViewTransform, TiledView, ZOOM_STEP # Zoom and pan
+from save_queue import SaveQueue # Background saves
+from render_cache import RenderCache # Reused preview and confirm renders
+from profiler import profiler # Stage timings and trace export
+from recipe import Recipe, RecipeRenderer # Replayable edit recipes
 import PIL.ImageTk as ImageTk
 import numpy as np
 
@@ -27,10 +36,40 @@ class PixelForgeEditor:
         self.root.geometry("800x600")
         self.root.configure(bg="#1F1F1F")  # Gray background
 
-        # Store the original image (managed in image_handler)
-        self.original_bgr = None
+        # The image as opened: read-only and sharing its pixels with current_image
+        # until the first in-place edit copies them (see writable_current_image)
+        self.original_image = None
+        self.image_version = 0  # Bumped on every change to current_image (display cache key)
         self.current_image = None
         self.temp_image = None  # Temporary image for preview
+        self.preview_proxy = None  # Canvas-sized copy of temp_image used by live previews
+        self.preview_scale = 1.0
+        self.preview_scheduler = PreviewScheduler(self.root)
+        self.load_scheduler = PreviewScheduler(self.root, poll_ms=30)  # Full decodes, newest file wins
+        self.loading_path = None
+        self.save_queue = SaveQueue(self.root)
+        self.save_options = dict(DEFAULT_SAVE_OPTIONS)  # Last settings chosen in the save dialog
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Undo/redo history (deltas only, capped at history_budget_mb)
+        self.history_budget_mb = 512
+        self.history = EditHistory(max_bytes=self.history_budget_mb * 1024 * 1024)
+
+        # Filter results keyed by (image_version, scale), operation and ROI, capped at render_cache_mb
+        self.render_cache_mb = 256
+        self.render_cache = RenderCache(max_bytes=self.render_cache_mb * 1024 * 1024)
+        self.preview_version = None  # image_version of temp_image
+
+        # Confirmed edits as a replayable recipe, kept per undo step (see recipe.py)
+        self.recipe = Recipe()
+        self.recipe_undo = []
+        self.recipe_redo = []
+
+        # Once a slider rests this long, the previewed setting is rendered at full
+        # resolution in the background so confirming can adopt it
+        self.full_render_delay_ms = 300
+        self.full_render_timer = None
+        self.full_renderer = FullRenderScheduler(self.root)
 
         # ROI selection variables
         self.roi_start = None 
@@ -58,11 +97,91 @@ class PixelForgeEditor:
         self.create_select_image_interface()
         self.create_features_interface()
 
+        # Zoom/pan view of canvas_features; every canvas<->image mapping goes through it
+        self.view = ViewTransform(600, 400)
+        self.tiled_view = TiledView(self.canvas_features, self.view)
+        self.pan_start = None
+        self.canvas_features.bind("<MouseWheel>", self.on_mouse_wheel)  # Windows/macOS
+        self.canvas_features.bind("<Button-4>", lambda event: self.zoom_view(ZOOM_STEP, event.x, event.y))  # Linux
+        self.canvas_features.bind("<Button-5>", lambda event: self.zoom_view(1 / ZOOM_STEP, event.x, event.y))
+        self.canvas_features.bind("<ButtonPress-2>", self.start_pan)
+        self.canvas_features.bind("<B2-Motion>", self.update_pan)
+        self.root.bind("<Control-0>", lambda event: self.fit_view())
+        self.root.bind("<F12>", lambda event: self.export_trace())
+
         self.show_welcome()
 
         # Photo reference for canvas (used in display_image)
         self.photo = None
 
+    # Replacing current_image bumps image_version so cached display
+    # pyramids are rebuilt; in-place edits call mark_image_changed()
+    @property
+    def current_image(self):
+        return self._current_image
+
+    @current_image.setter
+    def current_image(self, image):
+        self._current_image = image
+        self.mark_image_changed()
+
+    def mark_image_changed(self):
+        self.image_version += 1
+
+    def writable_current_image(self):
+        """current_image, copied first if it is still the read-only original (copy on write)."""
+        if not self.current_image.flags.writeable:
+            self.current_image = self.current_image.copy()
+        return self.current_image
+
+    def snapshot_current_image(self):
+        """current_image frozen read-only, for background work that must not see later edits.
+
+        No pixels are copied: the next in-place edit goes through
+        writable_current_image and copies the frame then instead.
+        """
+        self.current_image.setflags(write=False)
+        return self.current_image
+
+    def on_close(self):
+        """Let queued saves finish before the window closes."""
+        pending = self.save_queue.pending()
+        if pending:
+            self.status_label_features.config(text=f"Finishing {pending} save(s) before closing...", fg="orange")
+            self.root.after(100, self.on_close)
+            return
+        trace_path = os.environ.get("PIXELFORGE_TRACE")
+        if trace_path:
+            try:
+                profiler.export(trace_path)
+            except OSError as e:
+                print(f"Error writing trace: {e}")
+        self.root.destroy()
+
+    def export_trace(self):
+        """Save the recorded stage timings as a Chrome trace (F12)."""
+        file_path = tk.filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile="pixelforge-trace.json",
+            filetypes=[("Chrome trace", "*.json")],
+            title="Export Trace"
+        )
+        if not file_path:
+            return
+        try:
+            count = profiler.export(file_path)
+        except OSError as e:
+            print(f"Error writing trace: {e}")
+            self.status_label_features.config(text=f"Error writing trace: {e}", fg="red")
+            return
+        self.status_label_features.config(text=f"Trace saved: {os.path.basename(file_path)} ({count} events)", fg="green")
+
+    def update_frame_time(self):
+        stats = profiler.frame_stats()
+        if stats:
+            last, mean, worst = stats
+            self.frame_time_label.config(text=f"Frame {last:.0f} ms (avg {mean:.0f}, max {worst:.0f})")
+
     # -----------------------------
     # Welcome Interface
     # -----------------------------
@@ -144,7 +263,7 @@ class PixelForgeEditor:
         )
         title_label.pack(anchor="w", pady=(0, 10))
 
-        open_btn = tk.Button(
+        self.open_btn = tk.Button(
             left_frame,
             text="Open Image",
             command=self.handle_open_image,
@@ -154,9 +273,9 @@ class PixelForgeEditor:
             width=15,
             height=2
         )
-        open_btn.pack(anchor="w", pady=(0, 10))
+        self.open_btn.pack(anchor="w", pady=(0, 10))
 
-        next_btn = tk.Button(
+        self.next_btn = tk.Button(
             left_frame,
             text="Next",
             command=self.show_features,
@@ -166,7 +285,7 @@ class PixelForgeEditor:
             width=15,
             height=2
         )
-        next_btn.pack(anchor="w", pady=(0, 20))
+        self.next_btn.pack(anchor="w", pady=(0, 20))
 
         back_btn = tk.Button(
             left_frame,
@@ -299,6 +418,32 @@ class PixelForgeEditor:
             height=2
         ).pack(anchor="w", pady=(0, 10))
 
+        # Recipe buttons
+        recipe_btn_frame = tk.Frame(left_frame, bg="#1F1F1F")
+        recipe_btn_frame.pack(anchor="w", pady=(0, 10))
+
+        tk.Button(
+            recipe_btn_frame,
+            text="Save Recipe",
+            command=self.save_recipe,
+            bg="#404040",
+            fg="white",
+            font=("Arial", 12),
+            width=9,
+            height=2
+        ).pack(side="left", padx=(0, 5))
+
+        tk.Button(
+            recipe_btn_frame,
+            text="Apply Recipe",
+            command=self.apply_recipe,
+            bg="#404040",
+            fg="white",
+            font=("Arial", 12),
+            width=9,
+            height=2
+        ).pack(side="left")
+
         # Bottom Button 
         bottom_btn_frame = tk.Frame(left_frame, bg="#1F1F1F")
         bottom_btn_frame.pack(side="bottom", anchor="w", pady=(20, 0), fill="x")
@@ -359,6 +504,37 @@ class PixelForgeEditor:
         )
         reset_btn.pack(side="right")
 
+        # 3. Undo / Redo Buttons
+        self.redo_btn = tk.Button(
+            action_btn_frame,
+            text="Redo",
+            command=self.redo,
+            bg="#404040",
+            fg="white",
+            font=("Arial", 12),
+            width=8,
+            height=2,
+            state="disabled"
+        )
+        self.redo_btn.pack(side="right", padx=(0, 10))
+
+        self.undo_btn = tk.Button(
+            action_btn_frame,
+            text="Undo",
+            command=self.undo,
+            bg="#404040",
+            fg="white",
+            font=("Arial", 12),
+            width=8,
+            height=2,
+            state="disabled"
+        )
+        self.undo_btn.pack(side="right", padx=(0, 5))
+
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
+        self.root.bind("<Control-Z>", lambda event: self.redo())
+
         # -----------------------------
         # Control Frames (Blur, Brightness, Contrast, Sharpen)
         # -----------------------------
@@ -697,6 +873,16 @@ class PixelForgeEditor:
         )
         self.status_label_features.pack(pady=(10, 0))
 
+        # Rolling preview frame time, slider event to finished redraw
+        self.frame_time_label = tk.Label(
+            right_frame,
+            text="",
+            bg="#1F1F1F",
+            fg="#A0A0A0",
+            font=("Arial", 10)
+        )
+        self.frame_time_label.pack(pady=(2, 0))
+
     # --------------------------------------
     # Unified show/hide feature controls
     # --------------------------------------
@@ -718,6 +904,8 @@ class PixelForgeEditor:
 
     def hide_all_feature_controls(self):
         """Hide all feature control frames."""
+        self.preview_scheduler.cancel()
+        self.cancel_full_render()
         self.blur_controls_frame.pack_forget()
         self.brightness_controls_frame.pack_forget()
         self.contrast_controls_frame.pack_forget()
@@ -732,9 +920,15 @@ class PixelForgeEditor:
         self.select_frame.pack_forget()
         self.features_frame.pack_forget()
         self.welcome_frame.pack(fill="both", expand=True)
-        self.original_bgr = None
+        self.load_scheduler.cancel()
+        self.loading_path = None
+        self.next_btn.config(state="normal")
+        self.original_image = None
         self.current_image = None
         self.temp_image = None
+        self.history.clear()
+        self.reset_recipe()
+        self.update_history_buttons()
         self.canvas_select.delete("all")
         self.canvas_features.delete("all")
         self.status_label_select.config(text="No Image Loaded")
@@ -764,32 +958,109 @@ class PixelForgeEditor:
     # Image handling
     # --------------------------------------
     def handle_open_image(self):
-        result = open_image(self, self.status_label_select)
-        if result:
-            self.original_bgr, self.current_image = result
-            self.original_rgb_copy = self.current_image.copy()
-            display_image(self, self.current_image, canvas=self.canvas_select, status_label=self.status_label_select)
+        file_path = ask_image_path()
+        if not file_path:
+            return
+        filename = os.path.basename(file_path)
+
+        # Tools stay locked until the full-resolution decode has landed
+        self.loading_path = file_path
+        self.next_btn.config(state="disabled")
+
+        # Paint a reduced JPEG decode right away, then decode in full off the Tk thread
+        preview = read_reduced_image(file_path)
+        if preview is not None:
+            display_image(self, preview, canvas=self.canvas_select, status_label=self.status_label_select)
+        self.status_label_select.config(text=f"Loading: {filename}...", fg="orange")
+        self.load_scheduler.submit(lambda: (file_path, read_image(file_path)), self.finish_open_image)
+
+    def finish_open_image(self, loaded):
+        """Swap in the fully decoded image (runs on the Tk thread)."""
+        file_path, result = loaded
+        if file_path != self.loading_path:
+            return  # Another file was opened since
+        self.loading_path = None
+        filename = os.path.basename(file_path)
+        if result is None:
+            # Keep whatever was open before
+            if self.current_image is not None:
+                display_image(self, self.current_image, canvas=self.canvas_select, status_label=self.status_label_select)
+            else:
+                self.canvas_select.delete("all")
+            self.status_label_select.config(text=f"Could not open {filename}", fg="red")
+            self.next_btn.config(state="normal")
+            return
+
+        result.setflags(write=False)
+        self.original_image = result
+        self.current_image = result
+        self.history.clear()
+        self.reset_recipe()
+        self.render_cache.clear()  # Nothing rendered from the old image can be asked for again
+        self.update_history_buttons()
+        display_image(self, self.current_image, canvas=self.canvas_select, status_label=self.status_label_select)
+        self.status_label_select.config(text=f"Loaded: {filename}", fg="green")
+        self.next_btn.config(state="normal")
 
     def canvas_to_image_coords(self, x1, y1, x2, y2, canvas):
         if self.current_image is None:
             return None
-        canvas_width, canvas_height = 600, 400
         img_height, img_width = self.current_image.shape[:2]
-        scale = min(canvas_width / img_width, canvas_height / img_height)
-        scaled_width = int(img_width * scale)
-        scaled_height = int(img_height * scale)
-        x_offset = (canvas_width - scaled_width) // 2
-        y_offset = (canvas_height - scaled_height) // 2
-        scaled_x1 = max(0, x1 - x_offset)
-        scaled_y1 = max(0, y1 - y_offset)
-        scaled_x2 = min(scaled_width, x2 - x_offset)
-        scaled_y2 = min(scaled_height, y2 - y_offset)
-        img_x1 = int(scaled_x1 / scale)
-        img_y1 = int(scaled_y1 / scale)
-        img_x2 = int(scaled_x2 / scale)
-        img_y2 = int(scaled_y2 / scale)
+        self.view.set_image(img_width, img_height)
+        img_x1, img_y1 = self.view.canvas_to_image(min(x1, x2), min(y1, y2))
+        img_x2, img_y2 = self.view.canvas_to_image(max(x1, x2), max(y1, y2))
+        img_x1 = int(min(max(0, img_x1), img_width))
+        img_y1 = int(min(max(0, img_y1), img_height))
+        img_x2 = int(min(max(0, img_x2), img_width))
+        img_y2 = int(min(max(0, img_y2), img_height))
         return (img_x1, img_y1, img_x2, img_y2)
 
+    # --------------------------------------
+    # Zoom and pan
+    # --------------------------------------
+    def on_mouse_wheel(self, event):
+        self.zoom_view(ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP, event.x, event.y)
+
+    def zoom_view(self, factor, x, y):
+        if not self.can_change_view():
+            return
+        self.view.zoom_at(factor, x, y)
+        self.redraw_view()
+        self.status_label_features.config(text=f"Zoom {self.view.zoom * 100:.0f}% (Ctrl+0 to fit)", fg="orange")
+
+    def start_pan(self, event):
+        self.pan_start = (event.x, event.y)
+
+    def update_pan(self, event):
+        if self.pan_start is None or not self.can_change_view():
+            return
+        self.view.pan(event.x - self.pan_start[0], event.y - self.pan_start[1])
+        self.pan_start = (event.x, event.y)
+        self.redraw_view()
+
+    def fit_view(self):
+        if not self.can_change_view():
+            return
+        self.view.fit()
+        self.redraw_view()
+
+    def can_change_view(self):
+        # Tool previews are drawn on the fitted proxy, so the view stays put while one is open
+        return self.current_image is not None and self.temp_image is None
+
+    def redraw_view(self):
+        display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
+        self.draw_roi_outline()
+
+    def draw_roi_outline(self):
+        """Draw the selected ROI's outline where it falls at the current zoom."""
+        if not self.selected_roi:
+            return
+        x1, y1, x2, y2 = self.selected_roi
+        cx1, cy1 = self.view.image_to_canvas(x1, y1)
+        cx2, cy2 = self.view.image_to_canvas(x2, y2)
+        self.roi_rect = self.canvas_features.create_rectangle(cx1, cy1, cx2, cy2, outline="red", width=2)
+
     # --------------------------------------
     # ROI selection
     # --------------------------------------
@@ -827,6 +1098,14 @@ class PixelForgeEditor:
 
         x1, y1, x2, y2 = self.canvas_features.coords(self.roi_rect)
         self.selected_roi = self.canvas_to_image_coords(x1, y1, x2, y2, self.canvas_features)
+        if self.selected_roi:
+            ix1, iy1, ix2, iy2 = clip_roi(self.selected_roi, self.current_image.shape)
+            if ix1 >= ix2 or iy1 >= iy2:
+                # A click without a drag: keep editing the whole image
+                self.selected_roi = None
+                self.canvas_features.delete(self.roi_rect)
+                self.roi_rect = None
+                self.status_label_features.config(text="Selection is empty - drag to select an area", fg="orange")
         
         if self.selected_roi:
             ix1, iy1, ix2, iy2 = self.selected_roi
@@ -840,6 +1119,7 @@ class PixelForgeEditor:
         self.roi_start = None
         self.selected_roi = None
         self.temp_image = None
+        self.preview_proxy = None
         if self.roi_rect:
             self.canvas_features.delete(self.roi_rect)
             self.roi_rect = None
@@ -862,7 +1142,10 @@ class PixelForgeEditor:
         
         start_x, start_y = img_coords[0], img_coords[1]
         
-        frag_h, frag_w = self.copied_fragment.shape[:2]
+        fragment = self.copied_fragment
+        if self.current_image.ndim == 3:
+            fragment = expand_to_rgb(fragment)
+        frag_h, frag_w = fragment.shape[:2]
         img_h, img_w = self.current_image.shape[:2]
 
         end_y = min(start_y + frag_h, img_h)
@@ -872,9 +1155,24 @@ class PixelForgeEditor:
         visible_w = end_x - start_x
 
         if visible_h > 0 and visible_w > 0:
-            self.temp_image = self.current_image.copy()
-            
-            self.current_image[start_y:end_y, start_x:end_x] = self.copied_fragment[0:visible_h, 0:visible_w]
+            if fragment.ndim > self.current_image.ndim:
+                # A colour fragment turns a single-plane gray image back into RGB
+                gray = self.current_image
+                image = expand_to_rgb(gray)
+                image[start_y:end_y, start_x:end_x] = fragment[0:visible_h, 0:visible_w]
+                self.history.record(gray, image, label="Paste")
+                self.current_image = image
+                self.advance_recipe(self.recipe.incomplete())  # A paste cannot be replayed
+            else:
+                # Only the pasted rectangle is kept for undo
+                image = self.writable_current_image()
+                before = image[start_y:end_y, start_x:end_x].copy()
+                
+                image[start_y:end_y, start_x:end_x] = fragment[0:visible_h, 0:visible_w]
+                self.mark_image_changed()
+                self.history.record_patch(before, self.current_image, (start_x, start_y, end_x, end_y), "Paste")
+                self.advance_recipe(self.recipe.incomplete())  # A paste cannot be replayed
+            self.update_history_buttons()
             
             display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
             self.status_label_features.config(text="ROI Pasted!", fg="green")
@@ -886,10 +1184,150 @@ class PixelForgeEditor:
         self.canvas_features.unbind("<B1-Motion>")
         self.canvas_features.unbind("<ButtonRelease-1>")
         self.canvas_features.unbind("<Button-3>")
-        self.canvas_features.unbind("<Button-2>")
         if self.roi_rect:
             self.canvas_features.delete(self.roi_rect)
 
+    # --------------------------------------
+    # Preview proxy
+    # --------------------------------------
+    def begin_preview(self):
+        """Snapshot current_image and build the canvas-sized proxy the sliders preview on."""
+        # Previews never write to temp_image and every confirm builds its result
+        # from it, so a reference is enough here instead of a full-frame copy
+        self.temp_image = self.current_image
+        self.preview_version = self.image_version
+        # Reopening a tool on an unchanged image reuses the proxy built last time
+        self.preview_proxy, self.preview_scale = self.render_cache.get(
+            (self.preview_version, "proxy"), lambda: build_preview_proxy(self.temp_image))
+        self.view.fit()
+        # Show the proxy itself, so ROI previews can be pasted over it pixel for pixel
+        display_image(self, self.preview_proxy, canvas=self.canvas_features, status_label=self.status_label_features)
+
+    def preview_roi(self):
+        """Return selected_roi mapped onto the preview proxy, or None."""
+        if not self.selected_roi:
+            return None
+        return scale_roi(self.selected_roi, self.preview_scale)
+
+    def render_key(self, operation, roi=None, scale=1.0):
+        """Render cache key for operation (name and parameters) applied to temp_image at scale."""
+        return (self.preview_version, scale), operation, roi
+
+    def adopt_render(self, operation, roi=None):
+        """The full-resolution render of operation on temp_image (or its roi), or None if there is none.
+
+        A render is found in the render cache (the preview ran at scale 1, or
+        the background render finished) or is still in flight, in which case
+        it is waited for: finishing it is never slower than starting over.
+        """
+        key = self.render_key(operation, roi)
+        with profiler.span("adopt render", "confirm", operation=str(operation)):
+            return self._adopt_render(key)
+
+    def _adopt_render(self, key):
+        future = self.full_renderer.future_for(key)
+        if future is None:
+            self.cancel_full_render()  # Anything else queued would only compete for the CPU
+        frame = self.render_cache.take(key, lambda: None)
+        if frame is None and future is not None:
+            if not future.done():
+                self.status_label_features.config(text="Finishing full-resolution render...", fg="orange")
+                self.root.update_idletasks()
+            try:
+                frame = future.result()
+            except Exception as e:
+                print(f"Full-resolution render failed: {e}")
+            self.render_cache.take(key, lambda: None)  # It may have been stored while we waited
+            self.cancel_full_render()
+        return frame
+
+    def full_render(self, operation, image_filter):
+        """image_filter(temp_image), adopted from a finished or running render when there is one."""
+        frame = self.adopt_render(operation)
+        if frame is not None:
+            return frame
+        with profiler.span("filter", "confirm", operation=str(operation)):
+            return image_filter(self.temp_image)
+
+    def schedule_full_render(self, operation, image_filter, status_text):
+        """Render operation at full resolution once the slider has rested for full_render_delay_ms."""
+        self.cancel_full_render()
+        self.full_render_timer = self.root.after(
+            self.full_render_delay_ms, lambda: self.start_full_render(operation, image_filter, status_text))
+
+    def start_full_render(self, operation, image_filter, status_text):
+        self.full_render_timer = None
+        if self.temp_image is None:
+            return
+        roi = clip_roi(self.selected_roi, self.temp_image.shape) if self.selected_roi else None
+        src = self.temp_image
+        if roi:
+            x1, y1, x2, y2 = roi
+            if x1 >= x2 or y1 >= y2:
+                return  # Nothing to render
+            src = src[y1:y2, x1:x2]
+        key = self.render_key(operation, roi)
+        status_text = status_text or "Preview"
+
+        def ready(frame):
+            if self.temp_image is not None:
+                self.status_label_features.config(text=f"{status_text} (full resolution ready)", fg="blue")
+
+        self.status_label_features.config(text=f"{status_text} (rendering full resolution...)", fg="orange")
+        def render():
+            with profiler.span("full render", "background", operation=str(operation)):
+                return image_filter(src, 1.0)
+
+        self.full_renderer.submit(key, lambda: self.render_cache.get(key, render), ready)
+
+    def cancel_full_render(self):
+        if self.full_render_timer is not None:
+            self.root.after_cancel(self.full_render_timer)
+            self.full_render_timer = None
+        self.full_renderer.cancel()
+
+    @profiler.timed("schedule preview", "preview")
+    def schedule_preview(self, operation, preview_filter, status_text=None):
+        """Run preview_filter(src, scale) on the worker thread and draw the result when it is ready.
+
+        Without an ROI src is the whole proxy. With one, src is only the ROI
+        of the proxy and the result is pasted over the displayed proxy, so a
+        tick costs as much as the ROI, not the frame. Results are kept in the
+        render cache under operation (name and parameters), so going back to a
+        slider value or reopening the tool is served without rendering. When
+        the proxy is smaller than the image, the same filter then runs once
+        at full resolution (scale 1) in the background for confirm to adopt.
+        """
+        proxy, roi, scale = self.preview_proxy, self.preview_roi(), self.preview_scale
+        position = box = None
+        if roi:
+            proxy, position = proxy_roi_view(proxy, roi)
+            if proxy.size == 0:
+                return
+            box = (position[0], position[1], position[0] + proxy.shape[1], position[1] + proxy.shape[0])
+        key = self.render_key(operation, box, scale)
+        started = profiler.now()  # The slider event: a frame runs from here to the redraw
+
+        def render():
+            with profiler.span("filter", "preview", operation=str(operation), scale=scale):
+                return preview_filter(proxy, scale)
+
+        def show(preview):
+            if self.temp_image is None:
+                return  # Tool was confirmed or cancelled while rendering
+            if position is None:
+                display_image(self, preview, canvas=self.canvas_features, status_label=self.status_label_features)
+            else:
+                display_patch(self, preview, position, canvas=self.canvas_features)
+            if status_text:
+                self.status_label_features.config(text=status_text, fg="blue")
+            profiler.frame(f"preview {operation[0]}", started, operation=str(operation))
+            self.update_frame_time()
+
+        self.preview_scheduler.submit(lambda: self.render_cache.get(key, render), show)
+        if scale < 1.0:
+            self.schedule_full_render(operation, preview_filter, status_text)
+
     # --------------------------------------
     # Blur Feature
     # --------------------------------------
@@ -897,7 +1335,7 @@ class PixelForgeEditor:
         if self.current_image is None:
             self.status_label_features.config(text="No image to blur", fg="red")
             return
-        self.temp_image = self.current_image.copy()
+        self.begin_preview()
         self.blur_slider.set(self.blur_kernel)
         self.show_feature_controls("blur")
         self.status_label_features.config(text="Adjust blur intensity (live preview). ROI will be used if selected.", fg="orange")
@@ -908,21 +1346,18 @@ class PixelForgeEditor:
 
         self.blur_kernel = int(value)
 
-        if self.selected_roi:
-            preview = apply_blur_with_roi(self.temp_image.copy(), self.selected_roi, intensity=self.blur_kernel)
-        else:
-            preview = apply_blur(self.temp_image.copy(), intensity=self.blur_kernel)
-
-        display_image(self, preview, canvas=self.canvas_features, status_label=self.status_label_features)
-        self.status_label_features.config(text=f"Preview: Blur (Intensity {self.blur_kernel})", fg="blue")
+        intensity = self.blur_kernel
+        self.schedule_preview(("blur", intensity), lambda src, scale: apply_blur(src, intensity=intensity, scale=scale),
+                              f"Preview: Blur (Intensity {intensity})")
 
+    @profiler.timed("confirm blur", "confirm")
     def confirm_blur(self):
         if self.temp_image is None:
             return
         if self.selected_roi:
-            self.current_image = apply_blur_with_roi(self.temp_image.copy(), self.selected_roi, intensity=self.blur_kernel)
+            self.commit_roi_edit(lambda image: apply_blur_with_roi(image, self.selected_roi, intensity=self.blur_kernel, inplace=True), "Blur", ("blur", self.blur_kernel), ("blur", self.blur_kernel))
         else:
-            self.current_image = apply_blur(self.temp_image.copy(), intensity=self.blur_kernel)
+            self.commit_edit(self.full_render(("blur", self.blur_kernel), lambda image: apply_blur(image, intensity=self.blur_kernel)), "Blur", ("blur", self.blur_kernel))
         display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
         self.status_label_features.config(text=f"Blur applied ({self.blur_kernel})", fg="green")
         self.hide_all_feature_controls()
@@ -931,8 +1366,8 @@ class PixelForgeEditor:
 
     def cancel_blur(self):
         if self.temp_image is not None:
-            self.current_image = self.temp_image.copy()
-            display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
+            # Previews never touch current_image, so it is still temp_image
+            display_image(self, self.temp_image, canvas=self.canvas_features, status_label=self.status_label_features)
             self.status_label_features.config(text="Blur cancelled", fg="red")
         self.hide_all_feature_controls()
         self.reset_roi_selection()
@@ -944,7 +1379,7 @@ class PixelForgeEditor:
         if self.current_image is None:
             self.status_label_features.config(text="No image loaded", fg="red")
             return
-        self.temp_image = self.current_image.copy()
+        self.begin_preview()
         self.brightness_slider.set(self.brightness_value)
         self.show_feature_controls("brightness")
         self.status_label_features.config(text="Adjust brightness using the slider", fg="orange")
@@ -954,21 +1389,17 @@ class PixelForgeEditor:
             return
         self.brightness_value = int(value)
         
-        if self.selected_roi:
-            preview = adjust_brightness_with_roi(self.temp_image.copy(), self.selected_roi, self.brightness_value)
-        else:
-            preview = adjust_brightness(self.temp_image.copy(), self.brightness_value)
-            
-        display_image(self, preview, canvas=self.canvas_features, status_label=self.status_label_features)
-        self.status_label_features.config(text=f"Preview: Brightness ({self.brightness_value})", fg="blue")
+        val = self.brightness_value
+        self.schedule_preview(("brightness", val), lambda src, scale: adjust_brightness(src, val), f"Preview: Brightness ({val})")
 
+    @profiler.timed("confirm brightness", "confirm")
     def confirm_brightness(self):
         if self.temp_image is None: return
         val = self.brightness_slider.get()
         if self.selected_roi:
-            self.current_image = adjust_brightness_with_roi(self.temp_image.copy(), self.selected_roi, val)
+            self.commit_roi_edit(lambda image: adjust_brightness_with_roi(image, self.selected_roi, val, inplace=True), "Brightness", ("brightness", val), ("brightness", val))
         else:
-            self.current_image = adjust_brightness(self.temp_image.copy(), val)
+            self.commit_edit(self.full_render(("brightness", val), lambda image: adjust_brightness(image, val)), "Brightness", ("brightness", val))
         
         display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
         self.status_label_features.config(text=f"Brightness applied: {val}", fg="green")
@@ -991,7 +1422,7 @@ class PixelForgeEditor:
         if self.current_image is None:
             self.status_label_features.config(text="No image loaded", fg="red")
             return
-        self.temp_image = self.current_image.copy()
+        self.begin_preview()
         self.contrast_slider.set(self.contrast_value)
         self.show_feature_controls("contrast")
         self.status_label_features.config(text="Adjust contrast using the slider", fg="orange")
@@ -1001,21 +1432,17 @@ class PixelForgeEditor:
             return
         self.contrast_value = int(value)
         
-        if self.selected_roi:
-            preview = adjust_contrast_with_roi(self.temp_image.copy(), self.selected_roi, self.contrast_value)
-        else:
-            preview = adjust_contrast(self.temp_image.copy(), self.contrast_value)
-            
-        display_image(self, preview, canvas=self.canvas_features, status_label=self.status_label_features)
-        self.status_label_features.config(text=f"Preview: Contrast ({self.contrast_value})", fg="blue")
+        val = self.contrast_value
+        self.schedule_preview(("contrast", val), lambda src, scale: adjust_contrast(src, val), f"Preview: Contrast ({val})")
 
+    @profiler.timed("confirm contrast", "confirm")
     def confirm_contrast(self):
         if self.temp_image is None: return
         val = self.contrast_slider.get()
         if self.selected_roi:
-            self.current_image = adjust_contrast_with_roi(self.temp_image.copy(), self.selected_roi, val)
+            self.commit_roi_edit(lambda image: adjust_contrast_with_roi(image, self.selected_roi, val, inplace=True), "Contrast", ("contrast", val), ("contrast", val))
         else:
-            self.current_image = adjust_contrast(self.temp_image.copy(), val)
+            self.commit_edit(self.full_render(("contrast", val), lambda image: adjust_contrast(image, val)), "Contrast", ("contrast", val))
             
         display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
         self.status_label_features.config(text="Contrast applied", fg="green")
@@ -1038,7 +1465,7 @@ class PixelForgeEditor:
         if self.current_image is None:
             self.status_label_features.config(text="No image loaded", fg="red")
             return
-        self.temp_image = self.current_image.copy()
+        self.begin_preview()
         self.sharpen_slider.set(0)
         self.show_feature_controls("sharpen")
         self.status_label_features.config(text="Adjust sharpen strength", fg="orange")
@@ -1047,19 +1474,16 @@ class PixelForgeEditor:
         if self.temp_image is None:
             return
         strength = int(round(float(value)))
-        if self.selected_roi:
-            preview = apply_sharpen_with_roi(self.temp_image.copy(), self.selected_roi, strength)
-        else:
-            preview = apply_sharpen(self.temp_image.copy(), strength)
-        display_image(self, preview, canvas=self.canvas_features, status_label=self.status_label_features)
+        self.schedule_preview(("sharpen", strength), lambda src, scale: apply_sharpen(src, strength))
 
+    @profiler.timed("confirm sharpen", "confirm")
     def confirm_sharpen(self):
         if self.temp_image is None: return
         strength = self.sharpen_slider.get()
         if self.selected_roi:
-            self.current_image = apply_sharpen_with_roi(self.temp_image.copy(), self.selected_roi, strength)
+            self.commit_roi_edit(lambda image: apply_sharpen_with_roi(image, self.selected_roi, strength, inplace=True), "Sharpen", ("sharpen", strength), ("sharpen", strength))
         else:
-            self.current_image = apply_sharpen(self.temp_image.copy(), strength)
+            self.commit_edit(self.full_render(("sharpen", strength), lambda image: apply_sharpen(image, strength)), "Sharpen", ("sharpen", strength))
             
         display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
         self.status_label_features.config(text=f"Sharpen applied ({strength})", fg="green")
@@ -1083,7 +1507,7 @@ class PixelForgeEditor:
         if self.current_image is None:
             self.status_label_features.config(text="No image loaded", fg="red")
             return
-        self.temp_image = self.current_image.copy()
+        self.begin_preview()
         self.show_feature_controls("noise")
         self.status_label_features.config(text="Adjust denoise strength", fg="orange")
 
@@ -1091,26 +1515,21 @@ class PixelForgeEditor:
         if self.temp_image is None:
             return
         
-        kernel = max(1, int(int(value) * 15 / 100))
-        if kernel % 2 == 0: kernel += 1
+        kernel = denoise_kernel_size(value)
         
-        if self.selected_roi:
-            preview = apply_median_blur_with_roi(self.temp_image.copy(), self.selected_roi, kernel)
-        else:
-            preview = apply_median_blur(self.temp_image.copy(), kernel)
-        
-        display_image(self, preview, canvas=self.canvas_features, status_label=self.status_label_features)
+        # Shrink the kernel with the proxy so the preview matches the full-res result
+        self.schedule_preview(("noise", kernel), lambda src, scale: apply_median_blur(src, scale_kernel(kernel, scale)))
 
+    @profiler.timed("confirm noise reduction", "confirm")
     def confirm_noise_reduction(self):
         if self.temp_image is None: return
         val = self.noise_slider.get()
-        kernel = max(1, int(val * 15 / 100))
-        if kernel % 2 == 0: kernel += 1
+        kernel = denoise_kernel_size(val)
 
         if self.selected_roi:
-            self.current_image = apply_median_blur_with_roi(self.temp_image.copy(), self.selected_roi, kernel)
+            self.commit_roi_edit(lambda image: apply_median_blur_with_roi(image, self.selected_roi, kernel, inplace=True), "Noise Reduction", ("noise", val), ("noise", kernel))
         else:
-            self.current_image = apply_median_blur(self.temp_image.copy(), kernel)
+            self.commit_edit(self.full_render(("noise", kernel), lambda image: apply_median_blur(image, kernel)), "Noise Reduction", ("noise", val))
         
         display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
         self.status_label_features.config(text="Noise reduction applied", fg="green")
@@ -1132,24 +1551,22 @@ class PixelForgeEditor:
             self.status_label_features.config(text="No image loaded", fg="red")
             return
         
-        self.temp_image = self.current_image.copy()
-        
-        if self.selected_roi:
-            preview = apply_grayscale_with_roi(self.temp_image.copy(), self.selected_roi)
-        else:
-            preview = apply_grayscale(self.temp_image.copy())
-            
-        display_image(self, preview, canvas=self.canvas_features, status_label=self.status_label_features)
+        self.begin_preview()
         
         self.show_feature_controls("grayscale")
         self.status_label_features.config(text="Previewing Grayscale", fg="blue")
+        # The whole frame becomes one gray plane that later filters run on;
+        # an ROI stays RGB inside its frame
+        image_filter = apply_grayscale if self.selected_roi else grayscale_plane
+        self.schedule_preview(("grayscale",), lambda src, scale: image_filter(src))
 
+    @profiler.timed("confirm grayscale", "confirm")
     def confirm_grayscale(self):
         if self.temp_image is None: return
         if self.selected_roi:
-            self.current_image = apply_grayscale_with_roi(self.temp_image.copy(), self.selected_roi)
+            self.commit_roi_edit(lambda image: apply_grayscale_with_roi(image, self.selected_roi, inplace=True), "Grayscale", ("grayscale", None), ("grayscale",))
         else:
-            self.current_image = apply_grayscale(self.temp_image.copy())
+            self.commit_edit(self.full_render(("grayscale",), grayscale_plane), "Grayscale", ("grayscale", None))
             
         display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
         self.status_label_features.config(text="Grayscale applied", fg="green")
@@ -1171,9 +1588,13 @@ class PixelForgeEditor:
     # --------------------------------------
     def reset_to_original(self):
         """Revert the current image to the original state."""
-        if hasattr(self, 'original_rgb_copy') and self.original_rgb_copy is not None:
-            # Restore the image from the clean copy
-            self.current_image = self.original_rgb_copy.copy()
+        if self.original_image is not None:
+            # Share the read-only original again (undoable like any other edit)
+            restored = self.original_image
+            self.history.record(self.current_image, restored, label="Reset")
+            self.current_image = restored
+            self.advance_recipe(Recipe())
+            self.update_history_buttons()
             self.temp_image = None # Clear any temp previews
             
             # Reset all sliders to their default values
@@ -1191,11 +1612,154 @@ class PixelForgeEditor:
         else:
             self.status_label_features.config(text="Nothing to reset", fg="red")
 
+    # --------------------------------------
+    # Undo / Redo
+    # --------------------------------------
+    def commit_edit(self, result, label, step):
+        """Make result the current image and record the change from temp_image for undo.
+
+        step is the (name, value) the edit adds to the recipe.
+        """
+        with profiler.span("history", "confirm", label=label):
+            self.history.record(self.temp_image, result, self.selected_roi, label)
+        self.current_image = result
+        self.advance_recipe(self.recipe.with_step(*step))
+        self.update_history_buttons()
+
+    def commit_roi_edit(self, edit, label, step, operation=None):
+        """Run edit(image) in place on current_image and record only the selected rectangle for undo.
+
+        The ROI helpers write straight into the frame, so an ROI edit costs
+        a copy of the rectangle instead of two full-frame copies (plus one
+        copy the first time the read-only original is edited). When a
+        full-resolution render of operation on this rectangle exists (see
+        adopt_render), that patch is pasted instead of running the edit again.
+        step is the (name, value) the edit adds to the recipe.
+        """
+        image = self.writable_current_image()
+        x1, y1, x2, y2 = box = clip_roi(self.selected_roi, image.shape)
+        before = image[y1:y2, x1:x2].copy()
+        patch = None
+        if operation is not None:
+            patch = self.adopt_render(operation, box)
+        if patch is not None:
+            image[y1:y2, x1:x2] = patch
+            self.current_image = image
+        else:
+            with profiler.span("filter", "confirm", label=label):
+                self.current_image = edit(image)
+        with profiler.span("history", "confirm", label=label):
+            self.history.record_patch(before, self.current_image, (x1, y1, x2, y2), label)
+        if x1 < x2 and y1 < y2:  # An empty rectangle records no undo step either
+            self.advance_recipe(self.recipe.with_step(*step, roi=box, shape=image.shape))
+        self.update_history_buttons()
+
+    def update_history_buttons(self):
+        self.undo_btn.config(state="normal" if self.history.can_undo() else "disabled")
+        self.redo_btn.config(state="normal" if self.history.can_redo() else "disabled")
+
+    def undo(self):
+        self._step_history(self.history.undo, self.history.undo_label(), "Undo", self.recipe_undo, self.recipe_redo)
+
+    def redo(self):
+        self._step_history(self.history.redo, self.history.redo_label(), "Redo", self.recipe_redo, self.recipe_undo)
+
+    def _step_history(self, step, label, verb, recipes_from, recipes_to):
+        if self.current_image is None or label is None:
+            return
+        if recipes_from:
+            recipes_to.append(self.recipe)
+            self.recipe = recipes_from.pop()
+        # Drop any open tool preview before moving through history
+        if self.temp_image is not None:
+            self.hide_all_feature_controls()
+            self.reset_roi_selection()
+        self.current_image = step(self.writable_current_image())
+        display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
+        self.status_label_features.config(text=f"{verb}: {label}", fg="orange")
+        self.update_history_buttons()
+
+    # --------------------------------------
+    # Recipes
+    # --------------------------------------
+    def reset_recipe(self):
+        self.recipe = Recipe()
+        self.recipe_undo.clear()
+        self.recipe_redo.clear()
+
+    def advance_recipe(self, recipe):
+        """Make recipe current alongside a new undo step."""
+        self.recipe_undo.append(self.recipe)
+        self.recipe_redo.clear()
+        self.recipe = recipe
+
+    def save_recipe(self):
+        """Save the confirmed edits since the original as a recipe file."""
+        if not len(self.recipe):
+            self.status_label_features.config(text="No edits to save as a recipe", fg="red")
+            return
+
+        file_path = tk.filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile="recipe.json",
+            filetypes=[("PixelForge recipe", "*.json")],
+            title="Save Recipe"
+        )
+        if not file_path:
+            return
+        try:
+            self.recipe.save(file_path)
+        except OSError as e:
+            print(f"Error saving recipe: {e}")
+            self.status_label_features.config(text=f"Error saving recipe: {e}", fg="red")
+            return
+        note = "" if self.recipe.complete else " (pastes are not included)"
+        self.status_label_features.config(
+            text=f"Recipe saved: {os.path.basename(file_path)} ({len(self.recipe)} steps){note}", fg="green")
+
+    def apply_recipe(self):
+        """Render a recipe file from the original image and make it the current image (undoable).
+
+        The result after every step is kept in the render cache, so applying
+        a recipe again after changing one of its values only reruns the
+        steps from the changed one on.
+        """
+        if self.original_image is None:
+            self.status_label_features.config(text="No image loaded", fg="red")
+            return
+
+        file_path = tk.filedialog.askopenfilename(filetypes=[("PixelForge recipe", "*.json")], title="Apply Recipe")
+        if not file_path:
+            return
+        try:
+            recipe = Recipe.load(file_path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading recipe: {e}")
+            self.status_label_features.config(text=f"Could not load recipe: {e}", fg="red")
+            return
+
+        # Drop any open tool preview, the recipe replaces what it was editing
+        if self.temp_image is not None:
+            self.hide_all_feature_controls()
+            self.reset_roi_selection()
+        self.status_label_features.config(text="Applying recipe...", fg="orange")
+        self.root.update_idletasks()
+        with profiler.span("apply recipe", "confirm", steps=len(recipe)):
+            result = RecipeRenderer(self.original_image, self.render_cache).render(recipe)
+        self.history.record(self.current_image, result, label="Recipe")
+        self.current_image = result
+        self.advance_recipe(recipe)
+        self.update_history_buttons()
+
+        display_image(self, self.current_image, canvas=self.canvas_features, status_label=self.status_label_features)
+        self.status_label_features.config(
+            text=f"Recipe applied: {os.path.basename(file_path)} ({len(recipe)} steps)", fg="green")
+
     # --------------------------------------
     # Save Image Feature
     # --------------------------------------
     def handle_save_image(self):
-        """Open file dialog and save the current image."""
+        """Open file dialog and queue the current image for saving."""
         if self.current_image is None:
             self.status_label_features.config(text="No image to save!", fg="red")
             return
@@ -1206,17 +1770,115 @@ class PixelForgeEditor:
             filetypes=[
                 ("PNG file", "*.png"),
                 ("JPEG file", "*.jpg"),
+                ("WebP file", "*.webp"),
                 ("All Files", "*.*")
             ],
             title="Save Image As"
         )
 
         if file_path:
-            # Call the save function we added to image_handler
-            success = save_image(self.current_image, file_path)
-            
-            if success:
-                filename = os.path.basename(file_path)
-                self.status_label_features.config(text=f"Saved: {filename}", fg="green")
-            else:
-                self.status_label_features.config(text="Error saving file", fg="red")
\ No newline at end of file
+            self.show_save_options(file_path)
+
+    def show_save_options(self, file_path):
+        """Ask for the encoder settings of the chosen format, then queue the save."""
+        file_format = save_format(file_path)
+        if file_format is None:
+            self.queue_save(file_path)  # BMP, TIFF, ... have nothing to choose
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Save Options")
+        dialog.configure(bg="#1F1F1F")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+
+        controls = {}
+        if file_format == "png":
+            controls["png_compression"] = self.add_save_option_slider(dialog, "PNG compression (0 = fastest, 9 = smallest):", 0, 9, "png_compression")
+        elif file_format == "jpeg":
+            controls["jpeg_quality"] = self.add_save_option_slider(dialog, "JPEG quality:", 1, 100, "jpeg_quality")
+            progressive = tk.BooleanVar(value=self.save_options["jpeg_progressive"])
+            tk.Checkbutton(
+                dialog,
+                text="Progressive",
+                variable=progressive,
+                bg="#1F1F1F",
+                fg="white",
+                selectcolor="#404040",
+                activebackground="#1F1F1F",
+                font=("Arial", 12)
+            ).pack(anchor="w", padx=20, pady=(0, 10))
+            controls["jpeg_progressive"] = progressive
+        else:
+            controls["webp_quality"] = self.add_save_option_slider(dialog, "WebP quality (101 = lossless):", 1, 101, "webp_quality")
+
+        def confirm():
+            for key, control in controls.items():
+                self.save_options[key] = control.get()
+            dialog.destroy()
+            self.queue_save(file_path)
+
+        button_row = tk.Frame(dialog, bg="#1F1F1F")
+        button_row.pack(side="bottom", pady=(0, 15))
+        tk.Button(
+            button_row,
+            text="Save",
+            command=confirm,
+            bg="#28a745",
+            fg="white",
+            font=("Arial", 12, "bold"),
+            width=10
+        ).pack(side="left", padx=5)
+        tk.Button(
+            button_row,
+            text="Cancel",
+            command=dialog.destroy,
+            bg="#404040",
+            fg="white",
+            font=("Arial", 12),
+            width=10
+        ).pack(side="left", padx=5)
+
+    def add_save_option_slider(self, dialog, text, low, high, key):
+        tk.Label(dialog, text=text, bg="#1F1F1F", fg="white", font=("Arial", 12)).pack(anchor="w", padx=20, pady=(15, 0))
+        slider = tk.Scale(
+            dialog,
+            from_=low,
+            to=high,
+            resolution=1,
+            orient="horizontal",
+            length=250,
+            bg="#1F1F1F",
+            fg="white",
+            highlightbackground="#404040"
+        )
+        slider.set(self.save_options[key])
+        slider.pack(padx=20, pady=(0, 10))
+        return slider
+
+    def queue_save(self, file_path):
+        """Save a snapshot of the current image in the background; editing can go on meanwhile."""
+        self.save_queue.submit(
+            self.snapshot_current_image(),
+            file_path,
+            dict(self.save_options),
+            on_progress=self.on_save_progress,
+            on_done=self.on_save_done
+        )
+        self.on_save_progress(file_path, "queued", None)
+
+    def on_save_progress(self, file_path, stage, fraction):
+        text = f"Saving {os.path.basename(file_path)}: {stage}"
+        if fraction is not None:
+            text += f" {fraction:.0%}"
+        waiting = self.save_queue.pending() - 1
+        if waiting > 0:
+            text += f" ({waiting} more queued)"
+        self.status_label_features.config(text=text, fg="orange")
+
+    def on_save_done(self, file_path, success, error):
+        filename = os.path.basename(file_path)
+        if success:
+            self.status_label_features.config(text=f"Saved: {filename}", fg="green")
+        else:
+            self.status_label_features.config(text=f"Error saving {filename}: {error}", fg="red")
\ No newline at end of file
@@ -1,17 +1,31 @@
 import cv2
+from roi_utils import roi_target
 
-def apply_grayscale(image):
-    """Convert RGB image to a visually grayscale 3-channel image"""
+def grayscale_plane(image, dst=None):
+    """Convert an RGB image to a single gray plane (one that is already a plane is copied)"""
+    if image.ndim == 2:
+        if dst is None:
+            return image.copy()
+        dst[...] = image
+        return dst
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY, dst=dst)
+
+def expand_to_rgb(image):
+    """RGB copy of a single gray plane; RGB images are returned as they are"""
+    if image.ndim == 3:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+
+def apply_grayscale(image, dst=None):
+    """Convert RGB image to a visually grayscale 3-channel image (a gray plane stays one plane)"""
+    if image.ndim == 2:
+        return grayscale_plane(image, dst)
     gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-    return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB, dst=dst)
 
-def apply_grayscale_with_roi(image, roi_coords):
+def apply_grayscale_with_roi(image, roi_coords, dst=None, inplace=False):
     """Convert only the ROI area to grayscale"""
-    x1, y1, x2, y2 = roi_coords
-    result = image.copy()
-    
-    roi = image[y1:y2, x1:x2]
-    processed_roi = apply_grayscale(roi)
-    
-    result[y1:y2, x1:x2] = processed_roi
-    return result
\ No newline at end of file
+    result, src, target = roi_target(image, roi_coords, dst, inplace)
+    if src is not None:
+        apply_grayscale(src, dst=target)
+    return result
@@ -0,0 +1,148 @@
+# history.py
+import zlib
+
+import numpy as np
+
+from roi_utils import clip_roi
+
+DEFAULT_HISTORY_BUDGET = 512 * 1024 * 1024  # bytes kept for undo/redo
+
+class EditHistory:
+    """Multi-level undo/redo that stores only what each edit changed.
+
+    Each step keeps the XOR of the pixels before and after the edit, which is
+    enough to move either way: ROI edits keep just their rectangle, global
+    edits keep a zlib-compressed full-frame delta. When the total size goes
+    over max_bytes the oldest uncompressed steps are compressed first, then
+    the oldest steps are dropped.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_HISTORY_BUDGET, compress_level=1):
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self._undo = []
+        self._redo = []
+
+    def record(self, before, after, roi=None, label=""):
+        """Record an edit that turned `before` into `after` (both full frames)."""
+        if before.shape != after.shape:
+            # Channel count changed, a delta cannot describe it
+            step = {"kind": "frames", "before": self._pack(before, True), "after": self._pack(after, True)}
+        elif roi:
+            x1, y1, x2, y2 = clip_roi(roi, before.shape)
+            self.record_patch(before[y1:y2, x1:x2], after, (x1, y1, x2, y2), label)
+            return
+        else:
+            delta = np.bitwise_xor(before, after)
+            step = {"kind": "global", "delta": self._pack(delta, True)}
+        self._push(step, label)
+
+    def record_patch(self, before_patch, after, roi, label=""):
+        """Record an ROI edit from a copy of the rectangle taken before it ran.
+
+        Lets in-place edits (paste, in-place ROI filters) be recorded without
+        keeping a full-frame copy of the image they modified.
+        """
+        x1, y1, x2, y2 = clip_roi(roi, after.shape)
+        if x1 >= x2 or y1 >= y2:
+            return
+        delta = np.bitwise_xor(before_patch, after[y1:y2, x1:x2])
+        self._push({"kind": "roi", "roi": (x1, y1, x2, y2), "delta": self._pack(delta, False)}, label)
+
+    def _push(self, step, label):
+        step["label"] = label
+        self._undo.append(step)
+        self._redo.clear()
+        self._enforce_budget()
+
+    def undo(self, image):
+        """Return the image as it was before the last edit, or None if there is nothing to undo."""
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._redo.append(step)
+        return self._apply(step, image, "before")
+
+    def redo(self, image):
+        """Return the image with the last undone edit applied again, or None."""
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._undo.append(step)
+        return self._apply(step, image, "after")
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo_label(self):
+        return self._undo[-1]["label"] if self._undo else None
+
+    def redo_label(self):
+        return self._redo[-1]["label"] if self._redo else None
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    def memory_used(self):
+        """Bytes currently held by all undo and redo steps."""
+        return sum(_step_size(step) for step in self._undo + self._redo)
+
+    def _apply(self, step, image, target):
+        if step["kind"] == "frames":
+            return self._unpack(step[target])
+        delta = self._unpack(step["delta"])
+        # XOR is its own inverse, so the same delta undoes and redoes the edit
+        if step["kind"] == "roi":
+            x1, y1, x2, y2 = step["roi"]
+            region = image[y1:y2, x1:x2]
+            np.bitwise_xor(region, delta, out=region)
+        else:
+            np.bitwise_xor(image, delta, out=image)
+        return image
+
+    def _pack(self, array, compress):
+        if not compress:
+            return {"data": np.ascontiguousarray(array), "compressed": False}
+        data = zlib.compress(np.ascontiguousarray(array).data, self.compress_level)
+        return {"data": data, "shape": array.shape, "dtype": array.dtype, "compressed": True}
+
+    def _unpack(self, packed):
+        if not packed["compressed"]:
+            return packed["data"]
+        raw = zlib.decompress(packed["data"])
+        # Copy so the result is writable for in-place undo
+        return np.frombuffer(raw, dtype=packed["dtype"]).reshape(packed["shape"]).copy()
+
+    def _enforce_budget(self):
+        total = self.memory_used()
+        if total <= self.max_bytes:
+            return
+
+        # Oldest uncompressed ROI steps first, they usually shrink a lot
+        for step in self._undo:
+            if total <= self.max_bytes:
+                return
+            packed = step.get("delta")
+            if packed is not None and not packed["compressed"]:
+                before_size = _step_size(step)
+                step["delta"] = self._pack(packed["data"], True)
+                total -= before_size - _step_size(step)
+
+        # Then drop the oldest steps, always keeping the most recent one
+        while total > self.max_bytes and len(self._undo) > 1:
+            total -= _step_size(self._undo.pop(0))
+        while total > self.max_bytes and self._redo:
+            total -= _step_size(self._redo.pop(0))
+
+def _packed_size(packed):
+    data = packed["data"]
+    return data.nbytes if isinstance(data, np.ndarray) else len(data)
+
+def _step_size(step):
+    if step["kind"] == "frames":
+        return _packed_size(step["before"]) + _packed_size(step["after"])
+    return _packed_size(step["delta"])
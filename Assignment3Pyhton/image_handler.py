@@ -6,59 +6,232 @@ import cv2
 import numpy as np
 import os
 
-def open_image(editor, status_label):
-    """Open and load an image, returning the original BGR and current RGB images."""
-    file_path = filedialog.askopenfilename(
-        filetypes=[
-            ("Image files", "*.jpg *.jpeg *.png *.bmp *.tif *.tiff"),
-            ("All files", "*.*")
-        ]
-    )
-    
-    if file_path:
-        # Read with OpenCV (BGR format)
-        original_bgr = cv2.imread(file_path)
-        
-        if original_bgr is not None:
-            # Convert to RGB for display
-            current_image = cv2.cvtColor(original_bgr, cv2.COLOR_BGR2RGB)
-            
-            # Update status (using the passed status_label)
-            filename = os.path.basename(file_path)
-            status_label.config(text=f"Loaded: {filename}", fg="green")
-            
-            return original_bgr, current_image
+from profiler import profiler
+
+IMAGE_FILETYPES = [
+    ("Image files", "*.jpg *.jpeg *.png *.bmp *.tif *.tiff"),
+    ("All files", "*.*")
+]
+JPEG_EXTENSIONS = (".jpg", ".jpeg", ".jpe")
+# Scales the JPEG decoder can produce directly, largest reduction first
+REDUCED_READ_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+# Encoder settings used when saving; the editor keeps its own copy the save dialog edits
+DEFAULT_SAVE_OPTIONS = {
+    "png_compression": 3,  # 0 (fastest) to 9 (smallest)
+    "jpeg_quality": 95,  # 1 to 100
+    "jpeg_progressive": False,
+    "webp_quality": 95,  # 1 to 100, 101 is lossless
+}
+SAVE_FORMATS = {".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg", ".jpe": "jpeg", ".webp": "webp"}
+
+# How long the display has to stay idle before a fast redraw is replaced by a LANCZOS one
+REFINE_DELAY_MS = 150
+
+def ask_image_path():
+    """Ask the user for an image file; returns '' if they cancel."""
+    return filedialog.askopenfilename(filetypes=IMAGE_FILETYPES)
+
+def read_image(file_path):
+    """Decode a file into one RGB frame, or None if it cannot be read. Safe off the Tk thread."""
+    # Read with OpenCV (BGR format)
+    image = cv2.imread(file_path)
+    if image is None:
+        return None
+    # Swap to RGB in the decoded buffer instead of keeping a BGR and an RGB frame
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
+def read_reduced_image(file_path, display_size=(600, 400)):
+    """Quick low-resolution RGB decode for a first paint, or None when it would not help.
+
+    JPEG decoders can produce 1/2, 1/4 and 1/8 scale output while skipping
+    most of the work, so this takes a fraction of a full decode. The largest
+    reduction that still fills display_size is used. Other formats would be
+    decoded in full anyway, so they get no first paint.
+    """
+    if not file_path.lower().endswith(JPEG_EXTENSIONS):
+        return None
+    try:
+        with Image.open(file_path) as header:
+            width, height = header.size  # Only the header is read here
+    except OSError:
+        return None
+
+    display_width, display_height = fit_size(width, height, display_size)
+    for factor, flag in REDUCED_READ_FLAGS:
+        if width // factor >= display_width and height // factor >= display_height:
+            reduced = cv2.imread(file_path, flag)
+            return None if reduced is None else cv2.cvtColor(reduced, cv2.COLOR_BGR2RGB)
     return None
 
+class DisplayPyramid:
+    """Halved copies of one image, from full resolution down to about the display size.
+
+    Redraws resample from the smallest level that is still at least as big as
+    the display instead of from the full frame.
+    """
+
+    def __init__(self, image, display_size):
+        self.levels = [image]
+        level = image
+        while level.shape[1] // 2 >= display_size[0] and level.shape[0] // 2 >= display_size[1]:
+            level = cv2.resize(level, (level.shape[1] // 2, level.shape[0] // 2), interpolation=cv2.INTER_AREA)
+            self.levels.append(level)
+        self.display_size = display_size
+        self.frames = {}  # Finished display images by resampling filter
+
+    def level_for(self, width, height):
+        """Smallest level with at least width x height pixels (full resolution if none is)."""
+        for level in reversed(self.levels):
+            if level.shape[1] >= width and level.shape[0] >= height:
+                return level
+        return self.levels[0]
+
+    def frame(self, resample):
+        """The image resized to display_size with the given PIL filter (cached)."""
+        if resample not in self.frames:
+            with profiler.span("Image.fromarray", "display"):
+                level = Image.fromarray(self.levels[-1])
+            if level.size != self.display_size:
+                with profiler.span("resize", "display", resample=str(resample)):
+                    level = level.resize(self.display_size, resample)
+            self.frames[resample] = level
+        return self.frames[resample]
+
+def fit_size(width, height, box):
+    """Size of a width x height image shrunk (never enlarged) to fit box, keeping its aspect ratio."""
+    scale = min(1.0, box[0] / width, box[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def _display_pyramid(editor, rgb_image, display_size):
+    """Pyramid for the editor's current image, rebuilt when image_version changes.
+
+    Only current_image is cached, since it is the one array whose in-place
+    changes are tracked; previews and other frames return None.
+    """
+    if rgb_image is not getattr(editor, "current_image", None):
+        return None
+    key = (id(rgb_image), rgb_image.shape, editor.image_version, display_size)
+    cache = getattr(editor, "display_cache", None)
+    if cache is None or cache[0] != key:
+        with profiler.span("build pyramid", "display"):
+            cache = (key, DisplayPyramid(rgb_image, display_size))
+        editor.display_cache = cache
+    return cache[1]
+
+@profiler.timed("display_image", "display")
 def display_image(editor, rgb_image, canvas=None, status_label=None):
     if canvas is None:
         canvas = editor.canvas_select
 
-    # Convert OpenCV RGB array to PIL Image
-    pil_image = Image.fromarray(rgb_image)
-
     # Resize to fit canvas
     canvas_width = 600
     canvas_height = 400
-    pil_image.thumbnail((canvas_width, canvas_height), Image.Resampling.LANCZOS)
+    display_size = fit_size(rgb_image.shape[1], rgb_image.shape[0], (canvas_width, canvas_height))
+
+    pyramid = _display_pyramid(editor, rgb_image, display_size)
+    tiled_view = getattr(editor, "tiled_view", None)
+    if pyramid is not None and tiled_view is not None and tiled_view.canvas is canvas:
+        tiled_view.transform.set_image(rgb_image.shape[1], rgb_image.shape[0])
+        if tiled_view.transform.is_zoomed():
+            _cancel_refine(editor)
+            editor.photo = editor.patch_photo = None
+            with profiler.span("tiled render", "display"):
+                tiled_view.render(pyramid, editor.image_version)
+            return
+
+    refine = False
+    if pyramid is None:
+        # Convert OpenCV RGB array to PIL Image
+        with profiler.span("Image.fromarray", "display"):
+            pil_image = Image.fromarray(rgb_image)
+        if pil_image.size != display_size:
+            with profiler.span("resize", "display", resample="LANCZOS"):
+                pil_image = pil_image.resize(display_size, Image.Resampling.LANCZOS)
+    elif Image.Resampling.LANCZOS in pyramid.frames:
+        pil_image = pyramid.frame(Image.Resampling.LANCZOS)
+    else:
+        # Bilinear now, LANCZOS once redraws stop coming in
+        pil_image = pyramid.frame(Image.Resampling.BILINEAR)
+        refine = True
 
     # Convert to ImageTk
-    editor.photo = ImageTk.PhotoImage(pil_image)
+    with profiler.span("PhotoImage", "display"):
+        editor.photo = ImageTk.PhotoImage(pil_image)
+    editor.patch_photo = None
+    # Where the image's top-left corner lands (Tk centres with integer halves)
+    editor.display_origin = (canvas_width//2 - pil_image.width//2, canvas_height//2 - pil_image.height//2)
 
     # Clear and display
-    canvas.delete("all")
-    canvas.create_image(canvas_width//2, canvas_height//2, image=editor.photo, anchor="center")
-
-def save_image(rgb_image, file_path):
-    """Save the RGB image to the specified file path."""
-    if rgb_image is None:
-        return False
-    
-    try:
-        # Convert RGB back to BGR for saving with OpenCV (OpenCV uses BGR by default)
-        bgr_image = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR)
-        cv2.imwrite(file_path, bgr_image)
-        return True
-    except Exception as e:
-        print(f"Error saving image: {e}")
-        return False
\ No newline at end of file
+    with profiler.span("canvas redraw", "display"):
+        canvas.delete("all")
+        canvas.create_image(canvas_width//2, canvas_height//2, image=editor.photo, anchor="center", tags="display")
+
+    _cancel_refine(editor)
+    if refine:
+        editor.refine_job = editor.root.after(REFINE_DELAY_MS, _refine_display, editor, editor.photo, pyramid)
+
+def _cancel_refine(editor):
+    pending = getattr(editor, "refine_job", None)
+    if pending is not None:
+        editor.root.after_cancel(pending)
+        editor.refine_job = None
+
+def _refine_display(editor, photo, pyramid):
+    editor.refine_job = None
+    if editor.photo is not photo:
+        return  # Something else has been drawn since
+    with profiler.span("refine display", "display"):
+        photo.paste(pyramid.frame(Image.Resampling.LANCZOS))
+
+@profiler.timed("display_patch", "display")
+def display_patch(editor, rgb_patch, position, canvas=None):
+    """Draw rgb_patch over the displayed image with its top-left corner at position.
+
+    position is in displayed-image pixels, so the patch must come from an
+    image shown at that size (the preview proxy). Only the patch is converted
+    and uploaded to Tk, so the cost follows the patch size, not the image
+    size. The photo and canvas item are reused while the patch size stays
+    the same; the next display_image clears the patch.
+    """
+    if canvas is None:
+        canvas = editor.canvas_select
+
+    with profiler.span("Image.fromarray", "display"):
+        patch = Image.fromarray(rgb_patch)
+    x = editor.display_origin[0] + position[0]
+    y = editor.display_origin[1] + position[1]
+
+    photo = getattr(editor, "patch_photo", None)
+    if photo is not None and (photo.width(), photo.height()) == patch.size and canvas.find_withtag("patch"):
+        with profiler.span("PhotoImage paste", "display"):
+            photo.paste(patch)
+        canvas.coords("patch", x, y)
+    else:
+        with profiler.span("PhotoImage", "display"):
+            editor.patch_photo = ImageTk.PhotoImage(patch)
+        canvas.delete("patch")
+        canvas.create_image(x, y, image=editor.patch_photo, anchor="nw", tags="patch")
+        # Just above the image, below any ROI outline drawn on top of it
+        canvas.tag_raise("patch", "display")
+
+def save_format(file_path):
+    """"png", "jpeg" or "webp" for the file's extension, None for formats without options."""
+    return SAVE_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+def encoder_params(file_path, options=None):
+    """cv2.imwrite/imencode flags for the file's format, taken from a save options dict."""
+    options = {**DEFAULT_SAVE_OPTIONS, **(options or {})}
+    file_format = save_format(file_path)
+    if file_format == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(options["png_compression"])]
+    if file_format == "jpeg":
+        return [cv2.IMWRITE_JPEG_QUALITY, int(options["jpeg_quality"]),
+                cv2.IMWRITE_JPEG_PROGRESSIVE, int(bool(options["jpeg_progressive"]))]
+    if file_format == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, int(options["webp_quality"])]
+    return []
+
+def to_bgr(image):
+    """BGR copy of an RGB frame or a single gray plane (expanded to three channels) for OpenCV."""
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR if image.ndim == 2 else cv2.COLOR_RGB2BGR)
@@ -0,0 +1,49 @@
+# lut_cache.py
+import threading
+from collections import OrderedDict
+
+class LutCache:
+    """Lookup tables keyed by (operation, parameter) with LRU eviction.
+
+    Tables are returned read-only because the same array is handed to every
+    caller that asks for that setting again.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()  # previews build tables on a worker thread
+
+    def get(self, operation, value, builder):
+        """Return the table for (operation, value), calling builder(value) only on a miss."""
+        key = (operation, value)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return table
+
+        table = builder(value)
+        table.setflags(write=False)
+
+        with self._lock:
+            self.misses += 1
+            self._tables[key] = table
+            self._tables.move_to_end(key)
+            while len(self._tables) > self.max_entries:
+                self._tables.popitem(last=False)
+        return table
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._tables)
+
+# Shared by brightness, contrast and any other point operation that needs a table
+point_luts = LutCache()
@@ -0,0 +1,85 @@
+# operations.py
+from blur_effect import apply_blur, apply_blur_with_roi, blur_radius, blur_sigma
+from brightness_adjust import adjust_brightness, adjust_brightness_with_roi
+from contrast_adjust import adjust_contrast, adjust_contrast_with_roi
+from sharpen import apply_sharpen, apply_sharpen_with_roi
+from noise_reduction import apply_median_blur, apply_median_blur_with_roi, denoise_kernel_size
+from grayscale import apply_grayscale, apply_grayscale_with_roi
+
+# Every filter keyed by name, taking the same value its slider in the editor does.
+# "roi" variants receive the (x1, y1, x2, y2) rectangle in image coordinates.
+# "halo" is how many pixels around a tile the filter reads, so tiled runs have no seams.
+OPERATIONS = {
+    "blur": {
+        "apply": lambda image, value: apply_blur(image, intensity=value),
+        "apply_roi": lambda image, roi, value: apply_blur_with_roi(image, roi, intensity=value),
+        "default": 33,
+        "halo": lambda value: blur_radius(blur_sigma(value)),
+    },
+    "brightness": {
+        "apply": lambda image, value: adjust_brightness(image, value),
+        "apply_roi": lambda image, roi, value: adjust_brightness_with_roi(image, roi, value),
+        "default": 0,
+        "halo": lambda value: 0,
+    },
+    "contrast": {
+        "apply": lambda image, value: adjust_contrast(image, value),
+        "apply_roi": lambda image, roi, value: adjust_contrast_with_roi(image, roi, value),
+        "default": 0,
+        "halo": lambda value: 0,
+    },
+    "sharpen": {
+        "apply": lambda image, value: apply_sharpen(image, value),
+        "apply_roi": lambda image, roi, value: apply_sharpen_with_roi(image, roi, value),
+        "default": 0,
+        "halo": lambda value: 1,
+    },
+    "noise": {
+        "apply": lambda image, value: apply_median_blur(image, denoise_kernel_size(value)),
+        "apply_roi": lambda image, roi, value: apply_median_blur_with_roi(image, roi, denoise_kernel_size(value)),
+        "default": 20,
+        "halo": lambda value: denoise_kernel_size(value) // 2,
+    },
+    "grayscale": {
+        "apply": lambda image, value: apply_grayscale(image),
+        "apply_roi": lambda image, roi, value: apply_grayscale_with_roi(image, roi),
+        "default": None,
+        "halo": lambda value: 0,
+    },
+}
+
+def apply_operation(image, name, value=None, roi=None):
+    """Apply one named filter to an RGB image, optionally only inside an ROI."""
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown operation '{name}'. Choose from: {', '.join(OPERATIONS)}")
+    op = OPERATIONS[name]
+    if value is None:
+        value = op["default"]
+    if roi:
+        return op["apply_roi"](image, roi, value)
+    return op["apply"](image, value)
+
+def apply_operations(image, operations):
+    """Apply a list of (name, value) operations in order."""
+    for name, value in operations:
+        image = apply_operation(image, name, value)
+    return image
+
+def operation_halo(operations):
+    """Pixels of context a chain of (name, value) operations needs around each tile."""
+    return sum(OPERATIONS[name]["halo"](OPERATIONS[name]["default"] if value is None else value)
+               for name, value in operations)
+
+def parse_operation(spec):
+    """Parse a 'name' or 'name=value' string such as 'blur=40' into (name, value)."""
+    name, _, value = spec.partition("=")
+    name = name.strip().lower()
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown operation '{name}'. Choose from: {', '.join(OPERATIONS)}")
+    if not value.strip():
+        return name, OPERATIONS[name]["default"]
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid value for '{name}': {value}")
+    return name, int(number) if number.is_integer() else number
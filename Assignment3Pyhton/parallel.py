@@ -0,0 +1,90 @@
+# parallel.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Frames smaller than this run as one call, splitting them costs more than it saves
+MIN_PARALLEL_PIXELS = 1024 * 1024
+MIN_STRIP_ROWS = 64
+
+def _default_workers():
+    """PIXELFORGE_THREADS if it is a positive number, otherwise (unset or 0) one thread per core."""
+    value = os.environ.get("PIXELFORGE_THREADS", "").strip()
+    if value and value != "0":
+        try:
+            workers = int(value)
+        except ValueError:
+            workers = 0
+        if workers > 0:
+            return workers
+        # A bad value must not stop the editor or the batch tools from starting
+        print(f"Ignoring PIXELFORGE_THREADS={value!r}: expected a positive whole number, using one thread per core")
+    return os.cpu_count() or 1
+
+_pool = None
+_pool_lock = threading.Lock()
+_workers = _default_workers()
+
+def set_worker_count(workers):
+    """Set how many threads neighbourhood filters may use (1 turns splitting off)."""
+    global _workers, _pool
+    workers = max(1, int(workers))
+    with _pool_lock:
+        if workers != _workers and _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+        _workers = workers
+
+def worker_count():
+    return _workers
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="pixelforge-strip")
+        return _pool
+
+def strip_bounds(height, strips, halo):
+    """Split rows into (read_y1, read_y2, write_y1, write_y2) strips overlapping by halo rows."""
+    step = -(-height // strips)
+    for y1 in range(0, height, step):
+        y2 = min(height, y1 + step)
+        yield max(0, y1 - halo), min(height, y2 + halo), y1, y2
+
+def run_in_strips(func, image, halo, dst=None, workers=None):
+    """Run func(src, dst) over horizontal strips of image on the thread pool.
+
+    func is a whole-image filter that takes an optional dst, like
+    cv2.GaussianBlur. Each strip is read with `halo` extra rows above and
+    below (the kernel radius), so every output row sees the same neighbours
+    it would in one call and the result is identical. OpenCV releases the
+    GIL while it works, so the strips really run side by side.
+    """
+    workers = workers or _workers
+    height = image.shape[0]
+    strips = min(workers, height // max(MIN_STRIP_ROWS, 2 * halo))
+    if strips < 2 or image.shape[0] * image.shape[1] < MIN_PARALLEL_PIXELS:
+        return func(image, dst)
+
+    if dst is None:
+        dst = np.empty_like(image)
+    # In place the strips would read rows a neighbour has already written,
+    # so every strip is finished before any result is copied back
+    in_place = np.shares_memory(image, dst)
+
+    def run_strip(bounds):
+        ry1, ry2, y1, y2 = bounds
+        result = func(image[ry1:ry2], None)
+        if in_place:
+            return bounds, result
+        dst[y1:y2] = result[y1 - ry1:y2 - ry1]
+        return bounds, None
+
+    results = list(_get_pool().map(run_strip, strip_bounds(height, strips, halo)))
+    if in_place:
+        for (ry1, ry2, y1, y2), result in results:
+            dst[y1:y2] = result[y1 - ry1:y2 - ry1]
+    return dst
@@ -0,0 +1,40 @@
+# preview.py
+import cv2
+
+from roi_utils import clip_roi
+
+# Size of the feature canvas the previews are drawn on
+PREVIEW_SIZE = (600, 400)
+
+def build_preview_proxy(image, size=PREVIEW_SIZE):
+    """Downscale the image once to fit the canvas, returning the proxy and its scale."""
+    height, width = image.shape[:2]
+    scale = min(1.0, size[0] / width, size[1] / height)
+    if scale >= 1.0:
+        # Already small enough, previews can run on the image itself
+        return image, 1.0
+
+    proxy_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    proxy = cv2.resize(image, proxy_size, interpolation=cv2.INTER_AREA)
+    return proxy, scale
+
+def scale_roi(roi_coords, scale):
+    """Map full-resolution ROI coordinates onto a proxy of the given scale."""
+    x1, y1, x2, y2 = roi_coords
+    px1, py1 = int(x1 * scale), int(y1 * scale)
+    # Keep at least one pixel so a tiny ROI does not vanish on the proxy
+    px2 = max(px1 + 1, int(round(x2 * scale)))
+    py2 = max(py1 + 1, int(round(y2 * scale)))
+    return (px1, py1, px2, py2)
+
+def proxy_roi_view(proxy, roi):
+    """Clip a proxy ROI and return (view, (x, y)) so a preview can filter just that rectangle."""
+    x1, y1, x2, y2 = clip_roi(roi, proxy.shape)
+    return proxy[y1:y2, x1:x2], (x1, y1)
+
+def scale_kernel(kernel_size, scale):
+    """Scale an odd kernel size so the filter covers the same area on a proxy."""
+    scaled = int(round(kernel_size * scale))
+    if scaled % 2 == 0:
+        scaled += 1
+    return max(1, scaled)
@@ -0,0 +1,145 @@
+# preview_scheduler.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class PreviewScheduler:
+    """Run slider preview renders on a worker thread, keeping only the newest request.
+
+    Tk widgets may only be touched from the main thread, so finished frames are
+    handed back through root.after polling rather than called from the worker.
+    """
+
+    def __init__(self, root, poll_ms=16):
+        self.root = root
+        self.poll_ms = poll_ms  # ~60 Hz while a render is outstanding
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._generation = 0
+        self._pending = None  # (generation, job, on_done) waiting for the worker
+        self._finished = None  # (generation, frame, on_done) waiting for the UI
+        self._busy = False
+        self._polling = False
+
+        self._worker = threading.Thread(target=self._run, name="preview-worker", daemon=True)
+        self._worker.start()
+
+    def submit(self, job, on_done):
+        """Queue job() to run off the UI thread; on_done(frame) runs on the Tk thread.
+
+        A newer submit replaces any request the worker has not started yet, and
+        the result of a render that has been superseded is dropped.
+        """
+        with self._lock:
+            self._generation += 1
+            self._pending = (self._generation, job, on_done)
+        self._wakeup.set()
+        self._start_polling()
+
+    def cancel(self):
+        """Drop the pending request and ignore any render still in flight."""
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+            self._finished = None
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                request = self._pending
+                self._pending = None
+                self._wakeup.clear()
+                if request is None:
+                    continue
+                self._busy = True
+
+            generation, job, on_done = request
+            try:
+                frame = job()
+            except Exception as e:
+                print(f"Preview render failed: {e}")
+                frame = None
+
+            with self._lock:
+                self._busy = False
+                if frame is not None and generation == self._generation:
+                    self._finished = (generation, frame, on_done)
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        with self._lock:
+            finished = self._finished
+            self._finished = None
+            outstanding = self._busy or self._pending is not None
+            current = self._generation
+
+        if finished is not None and finished[0] == current:
+            _, frame, on_done = finished
+            on_done(frame)
+
+        if outstanding:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+class FullRenderScheduler:
+    """Render the full-resolution result of the last preview in the background.
+
+    Each request is a concurrent.futures.Future, so a confirm can adopt the
+    finished frame, or wait for the one already in flight, instead of
+    rendering it again. Only the newest request is kept: one that has not
+    started yet is cancelled when another arrives (a running OpenCV call
+    cannot be interrupted and is left to finish).
+    """
+
+    def __init__(self, root, poll_ms=100):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="full-render")
+        self._key = None
+        self._future = None
+        self._on_done = None
+        self._polling = False
+
+    def submit(self, key, job, on_done=None):
+        """Run job() for key off the UI thread; on_done(frame) runs on the Tk thread if it succeeds."""
+        if key == self._key and self._future is not None:
+            return self._future  # Already rendering exactly this
+        self.cancel()
+        self._key, self._future, self._on_done = key, self._executor.submit(job), on_done
+        self._start_polling()
+        return self._future
+
+    def future_for(self, key):
+        """The future rendering key, or None if the last request was for something else."""
+        return self._future if key == self._key else None
+
+    def cancel(self):
+        if self._future is not None:
+            self._future.cancel()
+        self._key = self._future = self._on_done = None
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        future = self._future
+        if future is not None and not future.done():
+            self.root.after(self.poll_ms, self._poll)
+            return
+        self._polling = False
+        if future is None or future.cancelled():
+            return
+
+        on_done, self._on_done = self._on_done, None
+        error = future.exception()
+        if error is not None:
+            print(f"Full-resolution render failed: {error}")
+        elif on_done:
+            on_done(future.result())
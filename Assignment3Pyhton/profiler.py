@@ -0,0 +1,110 @@
+# profiler.py
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+class Profiler:
+    """Timed spans of the editor's work, exportable as a Chrome trace.
+
+    A span costs two perf_counter calls and an append, so it is left on all
+    the time; the newest max_events are kept. Frame times (slider event to
+    finished redraw) are also kept over a rolling window for the status bar.
+    Open exported files in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, max_events=200000, window=30):
+        self.enabled = True
+        self._events = deque(maxlen=max_events)
+        self._frames = deque(maxlen=window)
+        self._threads = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def now(self):
+        return time.perf_counter()
+
+    @contextmanager
+    def span(self, name, category="editor", **args):
+        """Time the body of a with block as one trace event."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, category, start, time.perf_counter(), **args)
+
+    def timed(self, name, category="editor"):
+        """Decorator form of span."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def add(self, name, category, start, end, **args):
+        """Record a span measured elsewhere (start and end from perf_counter)."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        event = {
+            "name": name, "cat": category, "ph": "X",
+            "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6,
+            "pid": os.getpid(), "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._threads[thread.ident] = thread.name
+            self._events.append(event)
+
+    def frame(self, name, start, end=None, **args):
+        """Record one finished frame that started at start (slider event) and ended now.
+
+        Frames overlap the work on every thread, so they go on their own
+        async track instead of nesting under the Tk thread's spans.
+        """
+        end = time.perf_counter() if end is None else end
+        self._frames.append(end - start)
+        if not self.enabled:
+            return
+        with self._lock:
+            self._next_id += 1
+            common = {"name": name, "cat": "frame", "id": self._next_id, "pid": os.getpid(), "tid": 0}
+            self._events.append({**common, "ph": "b", "ts": (start - self._origin) * 1e6, "args": args})
+            self._events.append({**common, "ph": "e", "ts": (end - self._origin) * 1e6})
+
+    def frame_stats(self):
+        """(last, mean, max) frame time in ms over the rolling window, or None before the first frame."""
+        if not self._frames:
+            return None
+        frames = list(self._frames)
+        return frames[-1] * 1000, sum(frames) / len(frames) * 1000, max(frames) * 1000
+
+    def export(self, path):
+        """Write the recorded spans as a Chrome trace JSON file; returns the number of events."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        pid = os.getpid()
+        metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in threads.items()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._frames.clear()
+
+# Shared by the editor, image_handler and the background workers
+profiler = Profiler()
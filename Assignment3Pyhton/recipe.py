@@ -0,0 +1,158 @@
+# recipe.py
+import json
+
+from operations import OPERATIONS, apply_operation
+from pipeline import pipelines
+from render_cache import RenderCache
+from roi_utils import clip_roi
+
+RECIPE_VERSION = 1
+
+def normalize_roi(roi, shape):
+    """(x1, y1, x2, y2) in pixels to fractions of the image size."""
+    x1, y1, x2, y2 = clip_roi(roi, shape)
+    height, width = shape[:2]
+    return round(x1 / width, 6), round(y1 / height, 6), round(x2 / width, 6), round(y2 / height, 6)
+
+def denormalize_roi(roi, shape):
+    """Fractions of the image size back to a clipped (x1, y1, x2, y2) in pixels of this shape."""
+    height, width = shape[:2]
+    x1, y1, x2, y2 = roi
+    return clip_roi((round(x1 * width), round(y1 * height), round(x2 * width), round(y2 * height)), shape)
+
+class Recipe:
+    """Confirmed edits as (name, value, roi) steps that can be replayed on any image.
+
+    Names and values are the ones batch.py takes (see OPERATIONS), roi is
+    None for the whole frame or fractions of the image size, so a recipe made
+    on one photo lands on the same region of another of any resolution.
+    Recipes are never modified: with_step returns a new one, which lets the
+    editor keep one per undo step. complete is False once an edit that cannot
+    be replayed (a paste) was made on top of the recorded steps.
+    """
+
+    def __init__(self, steps=(), complete=True):
+        self.steps = tuple(steps)
+        self.complete = complete
+
+    def with_step(self, name, value=None, roi=None, shape=None):
+        """A new recipe with one more step; a pixel roi is normalized by shape."""
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'. Choose from: {', '.join(OPERATIONS)}")
+        if value is None:
+            value = OPERATIONS[name]["default"]
+        if roi is not None:
+            roi = normalize_roi(roi, shape)
+        return Recipe(self.steps + ((name, value, roi),), self.complete)
+
+    def incomplete(self):
+        return Recipe(self.steps, False)
+
+    def has_roi(self):
+        return any(roi is not None for _, _, roi in self.steps)
+
+    def operations(self):
+        """The steps as batch.py's (name, value) list; only meaningful without ROIs."""
+        return [(name, value) for name, value, _ in self.steps]
+
+    def groups(self):
+        """Consecutive steps sharing an ROI, as (roi, [(name, value), ...]) runs."""
+        groups = []
+        for name, value, roi in self.steps:
+            if groups and groups[-1][0] == roi:
+                groups[-1][1].append((name, value))
+            else:
+                groups.append((roi, [(name, value)]))
+        return groups
+
+    def render(self, image, out=None):
+        """Replay every step on an RGB image in one pass per ROI group.
+
+        Each group runs as a fused Pipeline, so a recipe costs what the same
+        chain costs in batch.py. Passing the image itself as out replays in place.
+        """
+        if out is None:
+            out = image.copy()
+        elif out is not image:
+            out[...] = image
+        for roi, operations in self.groups():
+            box = denormalize_roi(roi, out.shape) if roi is not None else None
+            pipelines.get(operations).run(out, roi=box, out=out)
+        return out
+
+    def to_dict(self):
+        return {
+            "version": RECIPE_VERSION,
+            "steps": [{"op": name, "value": value, "roi": list(roi) if roi is not None else None}
+                      for name, value, roi in self.steps],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != RECIPE_VERSION:
+            raise ValueError(f"Unsupported recipe version: {data.get('version')}")
+        steps = []
+        for step in data.get("steps", []):
+            roi = step.get("roi")
+            if roi is not None:
+                if len(roi) != 4:
+                    raise ValueError(f"Invalid ROI in recipe: {roi}")
+                roi = tuple(float(v) for v in roi)
+            name = step.get("op")
+            if name not in OPERATIONS:
+                raise ValueError(f"Unknown operation '{name}'. Choose from: {', '.join(OPERATIONS)}")
+            value = step.get("value")
+            steps.append((name, OPERATIONS[name]["default"] if value is None else value, roi))
+        return cls(steps)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __eq__(self, other):
+        return isinstance(other, Recipe) and self.steps == other.steps
+
+    def __hash__(self):
+        return hash(self.steps)
+
+class RecipeRenderer:
+    """Renders recipes from one source frame, keeping the result after every step.
+
+    The result after the first n steps is cached under those n steps, so
+    rendering a recipe again after a parameter change starts from the last
+    step before the first change instead of from the source.
+    """
+
+    def __init__(self, source, cache=None):
+        self.source = source
+        self.cache = cache if cache is not None else RenderCache()
+        self.steps_run = 0  # Steps actually computed by the last render
+
+    def render(self, recipe):
+        steps = recipe.steps
+        start, image = 0, self.source
+        for count in range(len(steps), 0, -1):
+            cached = self.cache.peek(self._key(steps[:count]))
+            if cached is not None:
+                start, image = count, cached
+                break
+
+        for index in range(start, len(steps)):
+            name, value, roi = steps[index]
+            box = denormalize_roi(roi, image.shape) if roi is not None else None
+            image = apply_operation(image, name, value, box)
+            self.cache.put(self._key(steps[:index + 1]), image)
+        self.steps_run = len(steps) - start
+        return image
+
+    def _key(self, steps):
+        # Steps alone would collide with another source sharing the cache
+        return "recipe", id(self.source), steps
@@ -0,0 +1,90 @@
+# render_cache.py
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+def _frames(value):
+    return [item for item in (value if isinstance(value, tuple) else (value,)) if isinstance(item, np.ndarray)]
+
+class RenderCache:
+    """Filter results keyed by (source, operation, roi) with LRU eviction under a byte budget.
+
+    source identifies the input frame (the editor uses its image_version and
+    the proxy scale), operation is the filter name with its parameters and
+    roi the clipped rectangle, or None for the whole frame. Stored frames are
+    made read-only because the same array is handed out on every hit.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()  # previews render on a worker thread
+
+    def get(self, key, builder):
+        """Return the result stored under key, calling builder() and storing its result on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = builder()
+        self.put(key, value)
+        return value
+
+    def peek(self, key):
+        """The result stored under key, or None; never builds and is not counted."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def take(self, key, builder):
+        """Like get, but a hit leaves the cache and a miss is not stored.
+
+        For results the caller keeps (a confirmed edit becomes the current
+        image), which would never be looked up under the same key again.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[1]
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        return builder()
+
+    def put(self, key, value):
+        """Store value (a frame or a tuple holding frames) under key, evicting the oldest entries."""
+        frames = _frames(value)
+        size = sum(frame.nbytes for frame in frames)
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        for frame in frames:
+            frame.setflags(write=False)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,31 @@
+# roi_utils.py
+
+def clip_roi(roi, shape):
+    """Order (x1, y1, x2, y2) and clip it to an image of this shape; the box may come back empty."""
+    x1, y1, x2, y2 = roi
+    height, width = shape[:2]
+    x1, x2 = max(0, min(x1, x2)), min(width, max(x1, x2))
+    y1, y2 = max(0, min(y1, y2)), min(height, max(y1, y2))
+    return x1, y1, x2, y2
+
+def roi_target(image, roi, dst=None, inplace=False):
+    """Choose where an ROI edit writes and return (result, src_view, dst_view).
+
+    With inplace the result is image itself, with dst it is dst (only the ROI
+    is written, so dst must already hold the rest of the frame), otherwise a
+    copy of image. Filters read src_view and write dst_view, so nothing
+    outside the rectangle is touched. The views are None for an empty ROI.
+    """
+    x1, y1, x2, y2 = clip_roi(roi, image.shape)
+    empty = x1 >= x2 or y1 >= y2
+    if inplace:
+        result = image
+    elif dst is not None:
+        result = dst
+    elif empty:
+        return image, None, None
+    else:
+        result = image.copy()
+    if empty:
+        return result, None, None
+    return result, image[y1:y2, x1:x2], result[y1:y2, x1:x2]
@@ -0,0 +1,110 @@
+# save_queue.py
+import os
+import queue
+import threading
+
+import cv2
+
+from image_handler import encoder_params, to_bgr
+
+WRITE_CHUNK = 4 * 1024 * 1024  # bytes per write, one progress report each
+
+def write_encoded(rgb_image, file_path, options=None, progress=None):
+    """Convert, encode and write one RGB frame or gray plane, calling progress(stage, fraction) along the way.
+
+    The encoded bytes go to a .part file next to the target that is renamed
+    over it at the end, so an interrupted save never leaves a truncated image
+    where a good one used to be.
+    """
+    progress = progress or (lambda stage, fraction=None: None)
+    extension = os.path.splitext(file_path)[1] or ".png"
+
+    progress("converting")
+    bgr_image = to_bgr(rgb_image)
+    progress("encoding")
+    ok, data = cv2.imencode(extension, bgr_image, encoder_params(file_path, options))
+    del bgr_image
+    if not ok:
+        raise ValueError(f"Could not encode {extension} image")
+
+    data = memoryview(data.reshape(-1))
+    partial_path = file_path + ".part"
+    try:
+        with open(partial_path, "wb") as f:
+            for start in range(0, len(data), WRITE_CHUNK):
+                end = min(len(data), start + WRITE_CHUNK)
+                f.write(data[start:end])
+                progress("writing", end / len(data))
+        os.replace(partial_path, file_path)
+    except OSError:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+class SaveQueue:
+    """Encode and write images on a background thread, in the order they were queued.
+
+    Each job owns a frame nobody modifies (the editor hands over a read-only
+    snapshot), so editing carries on while it encodes. Like PreviewScheduler,
+    progress and completion callbacks are delivered on the Tk thread through
+    root.after polling, which only runs while saves are outstanding.
+    """
+
+    def __init__(self, root, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._events = queue.Queue()  # (callback, args, finished) for the UI
+        self._outstanding = 0  # Only touched on the Tk thread
+        self._polling = False
+
+        self._worker = threading.Thread(target=self._run, name="save-worker", daemon=True)
+        self._worker.start()
+
+    def submit(self, rgb_image, file_path, options=None, on_progress=None, on_done=None):
+        """Queue a save; on_progress(path, stage, fraction) and on_done(path, ok, error) run on the Tk thread."""
+        self._outstanding += 1
+        self._jobs.put((rgb_image, file_path, options, on_progress, on_done))
+        self._start_polling()
+
+    def pending(self):
+        """Saves queued or in progress."""
+        return self._outstanding
+
+    def _run(self):
+        while True:
+            rgb_image, file_path, options, on_progress, on_done = self._jobs.get()
+
+            def progress(stage, fraction=None):
+                if on_progress:
+                    self._events.put((on_progress, (file_path, stage, fraction), False))
+
+            try:
+                write_encoded(rgb_image, file_path, options, progress)
+                result = (file_path, True, None)
+            except Exception as e:
+                print(f"Error saving image: {e}")
+                result = (file_path, False, str(e))
+            del rgb_image  # Release the snapshot before waiting for the next job
+            self._events.put((on_done, result, True))
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                callback, args, finished = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if finished:
+                self._outstanding -= 1
+            if callback:
+                callback(*args)
+
+        if self._outstanding:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
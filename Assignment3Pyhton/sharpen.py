@@ -1,19 +1,23 @@
 import cv2
 import numpy as np
 
-def apply_sharpen(image, intensity=1.0):
+from parallel import run_in_strips
+from roi_utils import roi_target
+
+def apply_sharpen(image, intensity=1.0, dst=None):
     
     w = (intensity / 100) * 2
     center = 1 + 8 * w
     kernel = np.array([[-w, -w, -w],
                        [-w, center, -w],
                        [-w, -w, -w]], dtype=np.float32)
-    return np.clip(cv2.filter2D(image, -1, kernel), 0, 255).astype(np.uint8)
+    # filter2D already saturates uint8 output, so no extra clip/astype copies
+    sharpen = lambda src, out: cv2.filter2D(src, -1, kernel, dst=out)
+    return run_in_strips(sharpen, image, 1, dst)
 
 
-def apply_sharpen_with_roi(image, roi, strength):
-    x1, y1, x2, y2 = roi
-    roi_img = image[y1:y2, x1:x2].copy()
-    roi_img = apply_sharpen(roi_img, strength)
-    image[y1:y2, x1:x2] = roi_img
-    return image
\ No newline at end of file
+def apply_sharpen_with_roi(image, roi, strength, dst=None, inplace=False):
+    result, src, target = roi_target(image, roi, dst, inplace)
+    if src is not None:
+        apply_sharpen(src, strength, dst=target)
+    return result
@@ -0,0 +1,323 @@
+# stream.py
+"""Stream video files, cameras and frame sequences through the same filters as the editor.
+
+Examples:
+    python stream.py clip.mp4 -o graded.mp4 --op brightness=10 --op sharpen=30
+    python stream.py "scans/frame_%04d.png" -o scans.mp4 --fps 24 --recipe look.json
+    python stream.py 0 -o camera.avi --op noise=20 --max-frames 300
+"""
+import argparse
+import functools
+import glob
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+import cv2
+
+from batch import collect_inputs
+from operations import parse_operation
+from pipeline import Pipeline
+from profiler import profiler
+from recipe import Recipe
+
+DEFAULT_QUEUE_SIZE = 4  # frames waiting between two stages
+DEFAULT_FPS = 30.0  # for sources that do not report a frame rate
+FOURCC_BY_EXTENSION = {".mp4": "mp4v", ".m4v": "mp4v", ".mov": "mp4v", ".avi": "MJPG", ".mkv": "XVID"}
+
+_END = object()  # Queued after the last frame
+
+def _natural_key(path):
+    # frame_2 before frame_10, even without zero padding
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+class FrameSource:
+    """BGR frames from cv2.VideoCapture or from a folder of images.
+
+    spec is a video file, a camera index such as 0, a printf pattern such
+    as frame_%04d.png (read by VideoCapture), or a directory or glob pattern
+    whose images are read in natural name order.
+    """
+
+    def __init__(self, spec):
+        self.files = None
+        self.capture = None
+        self.fps = None
+        self.frame_count = None
+        self._next = 0
+
+        if os.path.isdir(spec) or glob.has_magic(spec):
+            self.files = sorted(collect_inputs([spec]), key=_natural_key)
+            if not self.files:
+                raise ValueError(f"No images found in {spec}")
+            self.frame_count = len(self.files)
+            return
+
+        self.capture = cv2.VideoCapture(int(spec) if spec.isdigit() else spec)
+        if not self.capture.isOpened():
+            raise ValueError(f"Could not open {spec}")
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps > 0 else None
+        count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_count = count if count > 0 else None
+
+    def read(self, buffer=None):
+        """The next frame, decoded into buffer when it has the right size, or None at the end."""
+        if self.files is not None:
+            if self._next >= len(self.files):
+                return None
+            path = self.files[self._next]
+            self._next += 1
+            frame = cv2.imread(path)
+            if frame is None:
+                raise ValueError(f"Could not decode {path}")
+            return frame
+        ok, frame = self.capture.read(buffer) if buffer is not None else self.capture.read()
+        return frame if ok else None
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+
+class FrameSink:
+    """Writes BGR frames to a cv2.VideoWriter, or to numbered images for a printf pattern such as out/frame_%04d.png."""
+
+    def __init__(self, path, fps, fourcc=None):
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc or FOURCC_BY_EXTENSION.get(os.path.splitext(path)[1].lower(), "mp4v")
+        self.sequence = "%" in path
+        self.writer = None
+        self.frame_size = None  # (width, height) of the video, set by the first frame
+        self.count = 0  # Frames actually written
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def write(self, frame):
+        if self.sequence:
+            if not cv2.imwrite(self.path % self.count, frame):
+                raise ValueError(f"Could not write {self.path % self.count}")
+        else:
+            height, width = frame.shape[:2]
+            if self.writer is None:
+                # The frame size is only known once the first frame arrives
+                self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+                if not self.writer.isOpened():
+                    raise ValueError(f"Could not open {self.path} for writing with codec {self.fourcc}")
+                self.frame_size = (width, height)
+            elif (width, height) != self.frame_size:
+                # VideoWriter would silently drop the frame
+                raise ValueError(f"Frame {self.count} is {width}x{height}, but the video is "
+                                 f"{self.frame_size[0]}x{self.frame_size[1]}; all frames must have the same size")
+            self.writer.write(frame)
+        self.count += 1
+
+    def release(self):
+        if self.writer is not None:
+            self.writer.release()
+
+def make_frame_filter(operations):
+    """In-place filter for one RGB frame from a (name, value) list or a Recipe."""
+    if isinstance(operations, Recipe):
+        return lambda rgb: operations.render(rgb, out=rgb)
+    pipeline = Pipeline(operations)
+    return lambda rgb: pipeline.run(rgb, out=rgb)
+
+def _put(q, item, stop):
+    """Put that gives up once stop is set, so a failed stage cannot leave its neighbour blocked."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _END
+
+def run_stream(source, sink, operations, queue_size=DEFAULT_QUEUE_SIZE, max_frames=None, progress=None):
+    """Decode, filter and encode frames on three threads joined by bounded queues.
+
+    A full queue blocks the stage feeding it, so a slow encoder holds back
+    decoding instead of letting frames pile up: at most 2 * queue_size + 3
+    frames exist at once, and their buffers are handed back to the decoder
+    after encoding, so memory stays flat however long the stream runs.
+    progress(frames, fps) is called about once a second from the encoder
+    thread. Returns a summary dict with throughput and the time each stage
+    spent working per frame.
+    """
+    frame_filter = make_frame_filter(operations)
+    decoded = queue.Queue(maxsize=queue_size)
+    filtered = queue.Queue(maxsize=queue_size)
+    free = queue.Queue()  # Encoded frames, reused as decode buffers
+    stop = threading.Event()
+    errors = []
+    busy = {"decode": 0.0, "process": 0.0, "encode": 0.0}
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        end = time.perf_counter()
+        busy[stage] += end - start
+        profiler.add(stage, "stream", start, end)
+        return result
+
+    def stage(func):
+        @functools.wraps(func)
+        def run():
+            try:
+                func()
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+        return run
+
+    @stage
+    def decode():
+        count = 0
+        while not stop.is_set() and (max_frames is None or count < max_frames):
+            try:
+                buffer = free.get_nowait()
+            except queue.Empty:
+                buffer = None
+            frame = timed("decode", source.read, buffer)
+            if frame is None or not _put(decoded, frame, stop):
+                break
+            count += 1
+        _put(decoded, _END, stop)
+
+    def filter_frame(frame):
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+        result = frame_filter(rgb)
+        return cv2.cvtColor(result, cv2.COLOR_RGB2BGR, dst=result)
+
+    @stage
+    def process():
+        while True:
+            frame = _get(decoded, stop)
+            if frame is _END:
+                break
+            if not _put(filtered, timed("process", filter_frame, frame), stop):
+                return
+        _put(filtered, _END, stop)
+
+    start = time.perf_counter()
+    written = 0
+
+    @stage
+    def encode():
+        nonlocal written
+        last_report = start
+        while True:
+            frame = _get(filtered, stop)
+            if frame is _END:
+                break
+            timed("encode", sink.write, frame)
+            free.put(frame)
+            written += 1
+            now = time.perf_counter()
+            if progress and now - last_report >= 1.0:
+                last_report = now
+                progress(written, written / (now - start))
+
+    threads = [threading.Thread(target=func, name=f"stream-{func.__name__}", daemon=True)
+               for func in (decode, process, encode)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.2)
+    except KeyboardInterrupt:
+        # Stop reading; what has been written so far is still finalized
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        source.release()
+        sink.release()
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - start
+    frames = written
+    return {
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "stage_ms": {name: seconds * 1000 / frames if frames else 0.0 for name, seconds in busy.items()},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply PixelForge filters to video, camera footage or frame sequences.")
+    parser.add_argument("input", help="Video file, camera index, printf pattern (frame_%%04d.png), directory or glob of frames")
+    parser.add_argument("-o", "--output", required=True, help="Video file, or a printf pattern to write numbered frames")
+    parser.add_argument("--op", dest="operations", action="append", default=[], metavar="NAME[=VALUE]",
+                        help="Operation to apply, in order (blur, brightness, contrast, sharpen, noise, grayscale)")
+    parser.add_argument("--recipe", default=None, metavar="FILE", help="Recipe saved from the editor to apply instead of --op")
+    parser.add_argument("--fps", type=float, default=None, help="Output frame rate (default: the input's, or 30)")
+    parser.add_argument("--fourcc", default=None, help="Video codec such as mp4v or MJPG (default: chosen by extension)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Frames buffered between stages")
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop after this many frames (useful for cameras)")
+    parser.add_argument("--trace", default=None, metavar="FILE", help="Write the stage timings as a Chrome trace")
+    args = parser.parse_args(argv)
+
+    try:
+        operations = [parse_operation(spec) for spec in args.operations]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.recipe:
+        if operations:
+            parser.error("use either --op or --recipe, not both")
+        try:
+            operations = Recipe.load(args.recipe)
+        except (OSError, ValueError) as e:
+            parser.error(f"could not read recipe: {e}")
+    if not len(operations):
+        parser.error("at least one --op or a non-empty --recipe is required")
+    if args.queue_size < 1:
+        parser.error("--queue-size must be at least 1")
+
+    try:
+        source = FrameSource(args.input)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    sink = FrameSink(args.output, args.fps or source.fps or DEFAULT_FPS, args.fourcc)
+
+    reported = []
+
+    def report(frames, fps):
+        total = f"/{source.frame_count}" if source.frame_count else ""
+        print(f"\r{frames}{total} frames, {fps:.1f} fps", end="", file=sys.stderr, flush=True)
+        reported.append(frames)
+
+    try:
+        summary = run_stream(source, sink, operations, args.queue_size, args.max_frames, report)
+    except Exception as e:
+        print(f"\nFailed: {e}" if reported else f"Failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.trace:
+            profiler.export(args.trace)
+
+    if reported:
+        print(file=sys.stderr)  # End the progress line
+    stages = summary["stage_ms"]
+    print(f"Wrote {summary['frames']} frames in {summary['seconds']:.1f}s ({summary['fps']:.1f} fps; "
+          f"per frame: decode {stages['decode']:.1f} ms, process {stages['process']:.1f} ms, "
+          f"encode {stages['encode']:.1f} ms)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
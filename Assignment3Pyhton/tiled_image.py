@@ -0,0 +1,163 @@
+# tiled_image.py
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+from operations import operation_halo
+from pipeline import Pipeline
+
+DEFAULT_TILE_SIZE = 1024
+
+# OpenCV runs SIMD over the start of each row and scalar code over the last few
+# pixels, and the two can round HSV conversions differently by one level.
+# Starting and ending every tile row on a multiple of this keeps each pixel on
+# the same code path it would take in a whole-frame call. Read boxes also start
+# on a multiple of it vertically, so the pyramid grid of large blurs (a power
+# of two up to this) lines up with the whole frame's.
+ROW_ALIGNMENT = 64
+
+def tile_boxes(height, width, tile_size, halo=0):
+    """Yield (read_box, write_box) pairs covering the frame, as (x1, y1, x2, y2).
+
+    read_box is the tile grown by at least halo pixels on every side (clipped
+    to the frame), write_box is the tile itself.
+    """
+    tile_h, tile_w = (tile_size, tile_size) if np.isscalar(tile_size) else tile_size
+    for y1 in range(0, height, tile_h):
+        y2 = min(height, y1 + tile_h)
+        for x1 in range(0, width, tile_w):
+            x2 = min(width, x1 + tile_w)
+            rx1 = max(0, (x1 - halo) // ROW_ALIGNMENT * ROW_ALIGNMENT)
+            rx2 = min(width, -(-(x2 + halo) // ROW_ALIGNMENT) * ROW_ALIGNMENT)
+            ry1 = max(0, (y1 - halo) // ROW_ALIGNMENT * ROW_ALIGNMENT)
+            read_box = (rx1, ry1, rx2, min(height, y2 + halo))
+            yield read_box, (x1, y1, x2, y2)
+
+class TiledImage:
+    """RGB image kept in a memory-mapped .npy file and filtered tile by tile.
+
+    Only one tile (plus its halo) is held in ordinary memory at a time, the
+    rest stays in the file and is paged in and out by the OS. Filters see
+    each tile with halo pixels of real neighbours around it, so blur, median
+    and sharpen give the same result as on the whole frame, with no seams.
+    """
+
+    def __init__(self, pixels, path=None, owns_file=False):
+        self.pixels = pixels
+        self.path = path
+        self._owns_file = owns_file
+
+    @classmethod
+    def create(cls, shape, dtype=np.uint8, directory=None):
+        """New uninitialised image backed by a temporary file."""
+        fd, path = tempfile.mkstemp(suffix=".npy", prefix="pixelforge-", dir=directory)
+        os.close(fd)
+        pixels = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+        return cls(pixels, path, owns_file=True)
+
+    @classmethod
+    def from_array(cls, array, directory=None):
+        tiled = cls.create(array.shape, array.dtype, directory)
+        tiled.pixels[...] = array
+        tiled.pixels.flush()
+        return tiled
+
+    @classmethod
+    def open(cls, path, directory=None, tile_size=DEFAULT_TILE_SIZE):
+        """Open an image file as RGB.
+
+        .npy files are mapped directly without reading them into memory. Other
+        formats have to go through cv2.imread, which decodes the whole frame
+        once; the pixels are then moved into the memory-mapped file tile by
+        tile and the decoded frame is released. Like the whole-frame path in
+        batch.py, IMREAD_COLOR makes every file 8-bit BGR (16-bit samples are
+        scaled down, gray is expanded and alpha dropped), so the filters accept
+        it and both paths give the same output.
+        """
+        if path.lower().endswith(".npy"):
+            return cls(np.load(path, mmap_mode="r"), path)
+
+        bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise ValueError(f"Could not decode {path}")
+
+        tiled = cls.create(bgr.shape, bgr.dtype, directory)
+        height, width = bgr.shape[:2]
+        for _, (x1, y1, x2, y2) in tile_boxes(height, width, tile_size):
+            tiled.pixels[y1:y2, x1:x2] = cv2.cvtColor(bgr[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+        del bgr
+        tiled.pixels.flush()
+        return tiled
+
+    @property
+    def shape(self):
+        return self.pixels.shape
+
+    def apply(self, func, halo, tile_size=DEFAULT_TILE_SIZE, out=None):
+        """Run func(tile) -> tile over every tile and return the result as a new TiledImage.
+
+        func receives the tile with `halo` extra pixels on each side and must
+        return an array of the same size; only the centre is kept.
+        """
+        if out is None:
+            out = TiledImage.create(self.shape, self.pixels.dtype, self._directory())
+        height, width = self.shape[:2]
+
+        for (rx1, ry1, rx2, ry2), (x1, y1, x2, y2) in tile_boxes(height, width, tile_size, halo):
+            # np.array copies the tile out of the map so filters get ordinary memory
+            tile = func(np.array(self.pixels[ry1:ry2, rx1:rx2]))
+            out.pixels[y1:y2, x1:x2] = tile[y1 - ry1:y2 - ry1, x1 - rx1:x2 - rx1]
+        out.pixels.flush()
+        return out
+
+    def apply_operations(self, operations, tile_size=DEFAULT_TILE_SIZE, out=None):
+        """Run a chain of (name, value) operations tile by tile through one fused Pipeline."""
+        pipeline = Pipeline(operations)
+        # Each neighbourhood step reads further out, so the halos add up
+        halo = operation_halo(operations)
+        return self.apply(pipeline.run, halo, tile_size, out)
+
+    def save(self, path, tile_size=DEFAULT_TILE_SIZE):
+        """Write the image to path (.npy stays memory-mapped, other formats go through cv2.imwrite)."""
+        height, width = self.shape[:2]
+        if path.lower().endswith(".npy"):
+            target = np.lib.format.open_memmap(path, mode="w+", dtype=self.pixels.dtype, shape=self.shape)
+            for _, (x1, y1, x2, y2) in tile_boxes(height, width, tile_size):
+                target[y1:y2, x1:x2] = self.pixels[y1:y2, x1:x2]
+            target.flush()
+            del target
+            return True
+
+        # The encoder needs BGR; build it in a second mapped file, not in RAM
+        bgr = TiledImage.create(self.shape, self.pixels.dtype, self._directory())
+        try:
+            for _, (x1, y1, x2, y2) in tile_boxes(height, width, tile_size):
+                bgr.pixels[y1:y2, x1:x2] = cv2.cvtColor(np.array(self.pixels[y1:y2, x1:x2]), cv2.COLOR_RGB2BGR)
+            return cv2.imwrite(path, bgr.pixels)
+        finally:
+            bgr.close()
+
+    def to_array(self):
+        """Load the whole image into memory."""
+        return np.array(self.pixels)
+
+    def close(self):
+        """Drop the map and delete the backing file if this image created it."""
+        self.pixels = None  # Last reference closes the mmap
+        if self._owns_file and self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                # Windows refuses while another view still maps the file
+                print(f"Could not remove {self.path}: {e}")
+
+    def _directory(self):
+        return os.path.dirname(self.path) if self._owns_file and self.path else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,139 @@
+# viewport.py
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+TILE_SIZE = 256  # display pixels per tile side
+MAX_ZOOM = 8.0  # display pixels per image pixel
+ZOOM_STEP = 1.25
+
+class ViewTransform:
+    """Maps between canvas and image coordinates for a zoomed, panned view.
+
+    zoom is display pixels per image pixel and (offset_x, offset_y) is where
+    the canvas's top-left corner sits in the zoomed image, so
+    canvas = image * zoom - offset. The fitted view uses the same centring
+    as display_image, so one transform serves both.
+    """
+
+    def __init__(self, canvas_width, canvas_height):
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.image_width = self.image_height = 0
+        self.fit_zoom = self.zoom = 1.0
+        self.offset_x = self.offset_y = 0
+
+    def set_image(self, width, height):
+        """Track the image size; a different size goes back to the fitted view."""
+        if (width, height) != (self.image_width, self.image_height):
+            self.image_width, self.image_height = width, height
+            self.fit()
+
+    def fit(self):
+        """Show the whole image, shrunk (never enlarged) to the canvas."""
+        if self.image_width and self.image_height:
+            self.fit_zoom = min(1.0, self.canvas_width / self.image_width, self.canvas_height / self.image_height)
+        self.zoom = self.fit_zoom
+        self._clamp()
+
+    def is_zoomed(self):
+        return self.zoom > self.fit_zoom
+
+    def display_size(self):
+        """Size of the whole image at the current zoom, in display pixels."""
+        return max(1, round(self.image_width * self.zoom)), max(1, round(self.image_height * self.zoom))
+
+    def zoom_at(self, factor, x, y):
+        """Multiply the zoom by factor, keeping the image point under canvas (x, y) in place."""
+        image_x, image_y = self.canvas_to_image(x, y)
+        self.zoom = min(MAX_ZOOM, max(self.fit_zoom, self.zoom * factor))
+        self.offset_x = round(image_x * self.zoom - x)
+        self.offset_y = round(image_y * self.zoom - y)
+        self._clamp()
+
+    def pan(self, dx, dy):
+        """Move the image by (dx, dy) canvas pixels."""
+        self.offset_x -= dx
+        self.offset_y -= dy
+        self._clamp()
+
+    def canvas_to_image(self, x, y):
+        return (x + self.offset_x) / self.zoom, (y + self.offset_y) / self.zoom
+
+    def image_to_canvas(self, x, y):
+        return x * self.zoom - self.offset_x, y * self.zoom - self.offset_y
+
+    def _clamp(self):
+        display_width, display_height = self.display_size()
+        self.offset_x = _clamp_offset(self.offset_x, display_width, self.canvas_width)
+        self.offset_y = _clamp_offset(self.offset_y, display_height, self.canvas_height)
+
+def _clamp_offset(offset, display, canvas):
+    if display <= canvas:
+        # Centred, with the same integer halves Tk uses for anchor="center"
+        return display // 2 - canvas // 2
+    return min(max(0, offset), display - canvas)
+
+class TiledView:
+    """Draws a zoomed view as fixed-size tiles rendered on demand.
+
+    Only tiles that intersect the canvas are resampled, each from the
+    smallest DisplayPyramid level that still has enough pixels for the zoom,
+    so no full-frame resample ever happens. Finished tiles are kept in an LRU
+    cache, so panning only renders the newly exposed edge.
+    """
+
+    def __init__(self, canvas, transform, tile_size=TILE_SIZE, max_tiles=128):
+        self.canvas = canvas
+        self.transform = transform
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._version = None
+
+    def render(self, pyramid, version):
+        """Draw the visible tiles of the image behind pyramid (version invalidates the cache)."""
+        if version != self._version:
+            self._tiles.clear()
+            self._version = version
+
+        view = self.transform
+        size = self.tile_size
+        display_width, display_height = view.display_size()
+        first_x, first_y = max(0, view.offset_x // size), max(0, view.offset_y // size)
+        last_x = min((display_width - 1) // size, (view.offset_x + view.canvas_width - 1) // size)
+        last_y = min((display_height - 1) // size, (view.offset_y + view.canvas_height - 1) // size)
+
+        self.canvas.delete("all")
+        for ty in range(first_y, last_y + 1):
+            for tx in range(first_x, last_x + 1):
+                photo = self._tile(pyramid, tx, ty, display_width, display_height)
+                self.canvas.create_image(tx * size - view.offset_x, ty * size - view.offset_y,
+                                         image=photo, anchor="nw", tags="display")
+
+    def _tile(self, pyramid, tx, ty, display_width, display_height):
+        key = (self.transform.zoom, tx, ty)
+        photo = self._tiles.get(key)
+        if photo is not None:
+            self._tiles.move_to_end(key)
+            return photo
+
+        size = self.tile_size
+        x0, y0 = tx * size, ty * size
+        width, height = min(size, display_width - x0), min(size, display_height - y0)
+        level = pyramid.level_for(display_width, display_height)
+        # Source pixels per display pixel, under 2 because of the level choice
+        sx, sy = level.shape[1] / display_width, level.shape[0] / display_height
+        matrix = np.array([[sx, 0, (x0 + 0.5) * sx - 0.5], [0, sy, (y0 + 0.5) * sy - 0.5]])
+        # Magnified pixels stay sharp squares, which is what ROI picking needs
+        interpolation = cv2.INTER_NEAREST if sx <= 0.5 else cv2.INTER_LINEAR
+        tile = cv2.warpAffine(level, matrix, (width, height),
+                              flags=interpolation | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE)
+
+        photo = ImageTk.PhotoImage(Image.fromarray(tile))
+        self._tiles[key] = photo
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return photo